@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+M-Team 自动登录工具 - 缓存清理脚本
+"""
+
+import os
+import sys
+import queue
+import atexit
+import logging
+import logging.handlers
+import argparse
+
+# src目录路径只计算一次，真正的导入推迟到main()解析完参数之后，
+# 这样 --help 等路径不需要加载整个清理子系统
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+_SRC_DIR = os.path.join(_SCRIPT_DIR, 'src')
+
+
+def _load_cleaner_class():
+    """按需导入CacheCleaner，避免模块加载时的额外开销"""
+    if _SRC_DIR not in sys.path:
+        sys.path.insert(0, _SRC_DIR)
+    from src.cache_cleaner import CacheCleaner
+    return CacheCleaner
+
+
+def setup_logging(verbose=False, interactive=True):
+    """设置日志
+
+    文件写入通过队列交给后台线程批量处理，emit()只做入队，
+    避免每条日志都在主流程上阻塞一次磁盘write。
+    非交互运行（如cron调度）时不挂控制台handler，避免输出重复进日志。
+    """
+    os.makedirs('logs', exist_ok=True)
+
+    level = logging.DEBUG if verbose else logging.INFO
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+
+    # 用64KiB缓冲的追加fd代替FileHandler默认的行缓冲，
+    # 大量DEBUG日志时把N次小write合并成少量大write
+    flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+    flags |= getattr(os, 'O_CLOEXEC', 0)  # Windows上没有O_CLOEXEC
+    fd = os.open('logs/cache_cleanup.log', flags, 0o644)
+    log_stream = os.fdopen(fd, 'a', buffering=1 << 16, encoding='utf-8')
+    file_handler = logging.StreamHandler(log_stream)
+    file_handler.setFormatter(formatter)
+    atexit.register(log_stream.close)
+
+    # 主线程只入队，后台监听线程负责真正的文件写入
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # 入队时只保留原始消息，完整格式化留给监听线程的文件handler
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    handlers = [queue_handler]
+    if interactive:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    # force=True: 被包装脚本重复调用时不会重复挂handler
+    logging.basicConfig(level=level, handlers=handlers, force=True)
+
+
+# 标题在导入时编码一次，打印时直接写字节，避免每次调用重新编码
+_BANNER_BYTES = """
+╔══════════════════════════════════════════════════════════════╗
+║                M-Team 自动登录工具 - 缓存清理                  ║
+║                                                              ║
+║  功能: 清理Chrome临时目录、项目缓存和过期日志                  ║
+╚══════════════════════════════════════════════════════════════╝
+    \n""".encode('utf-8')
+
+
+def print_banner():
+    """打印程序标题"""
+    buffer = getattr(sys.stdout, 'buffer', None)
+    if buffer is not None:
+        buffer.write(_BANNER_BYTES)
+        sys.stdout.flush()
+    else:
+        # stdout被重定向/捕获时可能没有buffer属性
+        print(_BANNER_BYTES.decode('utf-8'), end='')
+
+
+def show_status(cleaner):
+    """显示当前清理状态"""
+    status = cleaner.get_cleanup_status()
+
+    # 拼成一个字符串一次性输出，避免九次print各自编码、加锁、刷新
+    out = (
+        f"📊 当前缓存清理状态:\n"
+        f"   • 清理功能: {'✅ 已启用' if status['enabled'] else '❌ 已禁用'}\n"
+        f"   • 清理间隔: {status['interval_days']} 天\n"
+        f"   • 浏览器缓存清理: {'✅' if status['cleanup_browser_cache'] else '❌'}\n"
+        f"   • 日志清理: {'✅' if status['cleanup_logs'] else '❌'}\n"
+        f"   • 日志保留天数: {status['keep_recent_logs_days']} 天\n"
+        f"   • 上次清理: {status['last_cleanup'][:19] if status['last_cleanup'] else '从未清理'}\n"
+        f"   • 下次清理: {status['next_cleanup'][:19] if status['next_cleanup'] else '待定'}\n"
+        f"   • 是否需要清理: {'✅ 是' if status['should_cleanup'] else '❌ 否'}\n"
+    )
+    sys.stdout.write(out)
+
+
+# 动作分发表: 动作名 -> (显示名称, CacheCleaner方法名)
+_ACTIONS = {
+    'browser_only': ('浏览器缓存', 'cleanup_browser_cache'),
+    'logs_only': ('日志文件', 'cleanup_logs'),
+    'force': ('强制缓存', 'force_cleanup'),
+}
+
+
+def _run_action(cleaner, label, method_name):
+    """执行单个清理动作并打印统一格式的结果"""
+    print(f"🧹 开始清理{label}...")
+    if getattr(cleaner, method_name)():
+        print(f"✅ {label}清理完成")
+    else:
+        print(f"⚠️ {label}清理部分失败，详情请查看日志")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='M-Team 自动登录工具缓存清理')
+    # 各动作互斥，统一写入args.action，非法组合由argparse直接拒绝
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--status', dest='action', action='store_const',
+                       const='status', help='查看当前清理状态')
+    group.add_argument('--auto', dest='action', action='store_const',
+                       const='auto', help='根据配置的时间间隔自动判断是否清理')
+    group.add_argument('--force', dest='action', action='store_const',
+                       const='force', help='强制执行完整清理（忽略时间间隔）')
+    group.add_argument('--browser-only', dest='action', action='store_const',
+                       const='browser_only', help='仅清理浏览器缓存')
+    group.add_argument('--logs-only', dest='action', action='store_const',
+                       const='logs_only', help='仅清理日志文件')
+    parser.add_argument('--verbose', action='store_true',
+                        help='输出详细日志')
+    args = parser.parse_args()
+    action = args.action or 'auto'
+
+    interactive = sys.stdout.isatty()
+    setup_logging(args.verbose, interactive)
+    if interactive:
+        print_banner()
+
+    try:
+        CacheCleaner = _load_cleaner_class()
+        cleaner = CacheCleaner()
+
+        if action == 'status':
+            show_status(cleaner)
+        elif action in _ACTIONS:
+            label, method_name = _ACTIONS[action]
+            _run_action(cleaner, label, method_name)
+        else:
+            # 默认与 --auto 行为一致：按配置的时间间隔判断
+            if cleaner.should_cleanup():
+                print("🧹 开始自动清理缓存...")
+                if cleaner.run_cleanup():
+                    print("✅ 自动清理完成")
+                else:
+                    print("⚠️ 自动清理部分失败，详情请查看日志")
+            else:
+                print("⏭️  距离上次清理时间不足，跳过本次清理")
+                show_status(cleaner)
+
+    except Exception as e:
+        print(f"❌ 缓存清理过程中发生错误: {e}")
+        logging.exception("详细错误信息:")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,16 +11,33 @@ import json
 import platform
 from pathlib import Path
 import urllib.request
+import hashlib
+import io
 import zipfile
-import tarfile
 import shutil
 import tempfile
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 # Chrome 二进制版本配置
 CHROME_VERSION = "140.0.7339.80"
 # Chrome二进制下载链接（使用Chrome for Testing获取二进制文件）
 CHROME_BASE_URL = f"https://storage.googleapis.com/chrome-for-testing-public/{CHROME_VERSION}"
 
+# 系统标识在进程生命周期内不变，导入时计算一次即可
+_SYSTEM = platform.system().lower()
+_IS_WINDOWS = _SYSTEM == "windows"
+
+_raw_arch = platform.machine().lower()
+if _raw_arch in ['x86_64', 'amd64']:
+    _ARCH = 'x64'
+elif _raw_arch in ['aarch64', 'arm64']:
+    _ARCH = 'arm64'
+elif _raw_arch in ['i386', 'i686', 'x86']:
+    _ARCH = 'x32'
+else:
+    _ARCH = _raw_arch
+
 
 def print_banner():
     """打印安装程序标题"""
@@ -37,37 +54,60 @@ def print_banner():
 
 def get_system_info():
     """获取系统信息"""
-    system = platform.system().lower()
-    arch = platform.machine().lower()
+    print(f"🖥️  检测到系统: {_SYSTEM} {_ARCH}")
+    print(f"🌐 Chrome版本: {CHROME_VERSION} (二进制版本)")
+    return _SYSTEM, _ARCH
 
-    if arch in ['x86_64', 'amd64']:
-        arch = 'x64'
-    elif arch in ['aarch64', 'arm64']:
-        arch = 'arm64'
-    elif arch in ['i386', 'i686', 'x86']:
-        arch = 'x32'
 
-    print(f"🖥️  检测到系统: {system} {arch}")
-    print(f"🌐 Chrome版本: {CHROME_VERSION} (二进制版本)")
-    return system, arch
+# 下载块大小：1MiB大块减少Python层read回调和write系统调用次数
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 
+def download_file(url, dest_path, description="文件", expected_sha256=None):
+    """下载文件并显示进度
 
-def download_file(url, dest_path, description="文件"):
-    """下载文件并显示进度"""
+    SHA-256在下载的分块循环中增量计算，文件字节只过一遍CPU缓存，
+    不需要下载完成后再整个重读一次做校验。
+    """
     print(f"📥 正在下载 {description}...")
 
     try:
         os.makedirs(os.path.dirname(dest_path), exist_ok=True)
 
-        def progress_hook(block_num, block_size, total_size):
-            if total_size > 0:
-                downloaded = block_num * block_size
-                percent = min(100, downloaded * 100 / total_size)
-                print(
-                    f"\r   进度: {percent:.1f}% ({downloaded//1024//1024}MB/{total_size//1024//1024}MB)", end='')
+        hasher = hashlib.sha256()
+        # 非交互环境（CI/重定向）不需要进度条
+        show_progress = sys.stdout.isatty()
+
+        with urllib.request.urlopen(url) as resp, open(dest_path, 'wb') as out:
+            total_size = int(resp.headers.get('Content-Length', 0))
+            downloaded = 0
+            last_percent = -1
+
+            while True:
+                chunk = resp.read(DOWNLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                out.write(chunk)
+                hasher.update(chunk)
+                downloaded += len(chunk)
+
+                # 进度只在整数百分比变化时刷新，避免每个块都写终端
+                if show_progress and total_size > 0:
+                    percent = min(100, downloaded * 100 // total_size)
+                    if percent != last_percent:
+                        last_percent = percent
+                        print(
+                            f"\r   进度: {percent}% ({downloaded//1024//1024}MB/{total_size//1024//1024}MB)", end='')
+
+        digest = hasher.hexdigest()
+        if expected_sha256 and digest != expected_sha256:
+            print(f"\n❌ {description} 校验失败: SHA-256不匹配")
+            print(f"   预期: {expected_sha256}")
+            print(f"   实际: {digest}")
+            os.unlink(dest_path)
+            return False
 
-        urllib.request.urlretrieve(url, dest_path, progress_hook)
-        print(f"\n✅ {description} 下载完成")
+        print(f"\n✅ {description} 下载完成 (SHA-256: {digest[:16]}...)")
         return True
 
     except Exception as e:
@@ -75,31 +115,152 @@ def download_file(url, dest_path, description="文件"):
         return False
 
 
-def extract_archive(archive_path, extract_to, description="压缩包"):
-    """解压缩文件"""
-    print(f"📦 正在解压 {description}...")
+class _SharedBufferReader(io.RawIOBase):
+    """在同一段只读字节缓冲上提供带独立读取位置的file-like视图
+
+    并行解压时每个线程拿到自己的视图实例，seek位置互不干扰，
+    底层字节通过memoryview共享，不复制数据。
+    """
+
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            self._pos = offset
+        elif whence == os.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = len(self._view) + offset
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = bytes(self._view[self._pos:])
+        else:
+            data = bytes(self._view[self._pos:self._pos + size])
+        self._pos += len(data)
+        return data
+
+
+def _parallel_extract_zip(open_zip, extract_to):
+    """并行解压ZIP成员
+
+    Deflate解压时zlib会释放GIL，按成员分发给线程池可以真正并行。
+    ZipFile共享句柄不是线程安全的，每个工作线程通过open_zip工厂
+    打开自己的ZipFile实例。
+
+    Args:
+        open_zip: 返回新ZipFile实例的可调用对象
+        extract_to: 解压目标目录
+    """
+    import threading
+
+    with open_zip() as zf:
+        infos = zf.infolist()
+
+    # 先串行建好所有目录，避免并行extract时的makedirs竞争
+    for info in infos:
+        target = os.path.join(extract_to, info.filename)
+        dir_path = target if info.is_dir() else os.path.dirname(target)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+    files = [info for info in infos if not info.is_dir()]
+    workers = min(os.cpu_count() or 1, 8)
+
+    if workers <= 1 or len(files) < 8:
+        with open_zip() as zf:
+            zf.extractall(extract_to)
+        return
+
+    local = threading.local()
+    opened = []
+    lock = threading.Lock()
+
+    def extract_member(info):
+        zf = getattr(local, 'zf', None)
+        if zf is None:
+            zf = local.zf = open_zip()
+            with lock:
+                opened.append(zf)
+        zf.extract(info, extract_to)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(extract_member, files))
+    finally:
+        for zf in opened:
+            zf.close()
+
+
+def download_and_extract_zip(url, extract_to, description="压缩包", expected_sha256=None):
+    """下载ZIP并直接解压，不把完整压缩包写到磁盘
+
+    压缩流先进内存（超过阈值自动溢出到临时文件），随后就地解压，
+    省掉约150MB的写盘+重读一遍。SHA-256同样在下载循环中顺带计算。
+    """
+    print(f"📥 正在下载并解压 {description}...")
 
     try:
         os.makedirs(extract_to, exist_ok=True)
 
-        if archive_path.endswith('.zip'):
-            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_to)
-        elif archive_path.endswith(('.tar.gz', '.tgz')):
-            with tarfile.open(archive_path, 'r:gz') as tar_ref:
-                tar_ref.extractall(extract_to)
-        else:
-            print(f"❌ 不支持的压缩格式: {archive_path}")
-            return False
+        with tempfile.SpooledTemporaryFile(max_size=256 * 1024 * 1024) as buf:
+            hasher = hashlib.sha256()
+            with urllib.request.urlopen(url) as resp:
+                while True:
+                    chunk = resp.read(DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    buf.write(chunk)
+                    hasher.update(chunk)
+
+            if expected_sha256 and hasher.hexdigest() != expected_sha256:
+                print(f"❌ {description} 校验失败: SHA-256不匹配")
+                print(f"   预期: {expected_sha256}")
+                print(f"   实际: {hasher.hexdigest()}")
+                return False
+
+            # 把下载好的压缩流读成共享只读缓冲，每个解压线程在其上
+            # 建立独立视图，走并行解压
+            buf.seek(0)
+            view = memoryview(buf.read())
+            _parallel_extract_zip(
+                lambda: zipfile.ZipFile(_SharedBufferReader(view)),
+                extract_to)
 
-        print(f"✅ {description} 解压完成")
+        print(f"✅ {description} 下载并解压完成")
         return True
 
     except Exception as e:
-        print(f"❌ {description} 解压失败: {e}")
+        print(f"❌ {description} 下载或解压失败: {e}")
         return False
 
 
+def _run(cmd, quiet=False, env=None):
+    """统一的子进程调用入口
+
+    quiet时丢弃输出；不传preexec_fn等参数，保证CPython走
+    posix_spawn快速路径（3.8+在POSIX上自动启用）。
+    """
+    return subprocess.run(
+        cmd,
+        stdout=subprocess.DEVNULL if quiet else None,
+        stderr=subprocess.STDOUT if quiet else None,
+        check=True,
+        env=env)
+
+
 def check_python_version():
     """检查Python版本"""
     version = sys.version_info
@@ -126,7 +287,7 @@ def create_virtual_environment():
 
     try:
         # 创建虚拟环境
-        subprocess.check_call([sys.executable, "-m", "venv", "venv"])
+        _run([sys.executable, "-m", "venv", "venv"])
         print("✅ 虚拟环境创建成功")
 
         venv_python = get_venv_python()
@@ -149,7 +310,7 @@ def get_venv_python():
     """获取虚拟环境中的Python可执行文件路径"""
     venv_path = Path("venv")
 
-    if platform.system().lower() == "windows":
+    if _IS_WINDOWS:
         python_exe = venv_path / "Scripts" / "python.exe"
     else:
         python_exe = venv_path / "bin" / "python"
@@ -161,7 +322,7 @@ def get_venv_pip():
     """获取虚拟环境中的pip可执行文件路径"""
     venv_path = Path("venv")
 
-    if platform.system().lower() == "windows":
+    if _IS_WINDOWS:
         pip_exe = venv_path / "Scripts" / "pip.exe"
     else:
         pip_exe = venv_path / "bin" / "pip"
@@ -200,6 +361,30 @@ def check_package_installed(package_name, venv_python=None):
         return False
 
 
+def _canonical_package_name(name):
+    """规范化包名，便于与pip list输出比较"""
+    return name.strip().lower().replace('_', '-')
+
+
+def get_installed_packages(venv_python):
+    """用一次pip调用获取虚拟环境中已安装的所有包"""
+    try:
+        result = subprocess.run([
+            venv_python, "-m", "pip", "list", "--format=freeze"
+        ], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+
+        installed = {}
+        for line in result.stdout.splitlines():
+            name, sep, version = line.partition('==')
+            if sep:
+                installed[_canonical_package_name(name)] = version.strip()
+        return installed
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
 def get_missing_packages(venv_python=None):
     """获取缺失的依赖包列表"""
     requirements_file = "requirements.txt"
@@ -211,6 +396,19 @@ def get_missing_packages(venv_python=None):
             all_packages = [line.strip() for line in f if line.strip()
                             and not line.startswith('#')]
 
+        # 虚拟环境：一次subprocess列出全部已装包，而不是每个包起一个进程
+        if venv_python:
+            installed = get_installed_packages(venv_python)
+            if installed is not None:
+                missing_packages = []
+                for package in all_packages:
+                    module_name = package.split('==')[0].split('>=')[
+                        0].split('<=')[0]
+                    if _canonical_package_name(module_name) not in installed:
+                        missing_packages.append(package)
+                return missing_packages
+            # pip list失败时退回逐个检查
+
         missing_packages = []
         for package in all_packages:
             if not check_package_installed(package, venv_python):
@@ -222,6 +420,16 @@ def get_missing_packages(venv_python=None):
         return []
 
 
+def _pip_env():
+    """pip子进程环境：缓存目录固定在项目bin/pip-cache下
+
+    这样删除venv/重装时可以直接命中本地wheel缓存，不必重新下载。
+    """
+    env = os.environ.copy()
+    env["PIP_CACHE_DIR"] = str((Path("bin") / "pip-cache").resolve())
+    return env
+
+
 def install_dependencies(venv_python=None):
     """在虚拟环境中安装Python依赖"""
     print("\n📦 检查Python依赖包...")
@@ -250,46 +458,34 @@ def install_dependencies(venv_python=None):
     if venv_python:
         print(f"   使用虚拟环境: {venv_python}")
 
-    # 首先升级pip
-    try:
-        subprocess.check_call([
-            python_exe, "-m", "pip", "install", "--upgrade", "pip"
-        ], stdout=subprocess.DEVNULL)
-        print("✅ pip已升级到最新版本")
-    except:
-        print("⚠️ pip升级失败，继续使用当前版本")
-
-    # 首先尝试批量安装缺失的包
+    # pip升级和依赖安装合并为一次pip调用，省掉一次解释器+pip冷启动
     try:
-        # 创建临时requirements文件只包含缺失的包
-        temp_requirements = "temp_requirements.txt"
-        with open(temp_requirements, 'w', encoding='utf-8') as f:
-            for pkg in missing_packages:
-                f.write(f"{pkg}\n")
-
-        subprocess.check_call([
-            python_exe, "-m", "pip", "install", "-r", temp_requirements
-        ])
-
-        # 清理临时文件
-        os.remove(temp_requirements)
+        _run([python_exe, "-m", "pip", "install", "--upgrade",
+              "pip", "--prefer-binary", *missing_packages], env=_pip_env())
 
-        print("✅ 依赖包安装完成")
+        print("✅ 依赖包安装完成（pip已同步升级）")
         return True
     except subprocess.CalledProcessError as e:
-        # 清理临时文件
-        if os.path.exists(temp_requirements):
-            os.remove(temp_requirements)
-
         print(f"⚠️  批量安装失败: {e}")
         print("🔄 尝试逐个安装依赖包...")
 
-        # 逐个安装缺失的包
+        # 退回顺序路径：先单独升级pip，再逐个安装
+        try:
+            _run([python_exe, "-m", "pip", "install", "--upgrade", "pip"],
+                 quiet=True, env=_pip_env())
+            print("✅ pip已升级到最新版本")
+        except Exception:
+            print("⚠️ pip升级失败，继续使用当前版本")
+
+        # 逐个安装缺失的包（并发执行，重叠各包的网络等待）
         try:
-            failed_packages = []
-            for package in missing_packages:
-                if not install_single_package(package, python_exe):
-                    failed_packages.append(package)
+            with ThreadPoolExecutor(
+                    max_workers=min(4, len(missing_packages))) as executor:
+                results = list(executor.map(
+                    lambda pkg: (pkg, install_single_package(pkg, python_exe)),
+                    missing_packages))
+
+            failed_packages = [pkg for pkg, ok in results if not ok]
 
             if failed_packages:
                 print(f"❌ 以下依赖包安装失败: {', '.join(failed_packages)}")
@@ -326,9 +522,8 @@ def install_single_package(package, python_exe=None):
 
     # 普通包的安装
     try:
-        subprocess.check_call([
-            python_exe, "-m", "pip", "install", package
-        ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        _run([python_exe, "-m", "pip", "install", "--prefer-binary", package],
+             quiet=True, env=_pip_env())
         print(f"✅ {package} 安装成功")
         return True
     except subprocess.CalledProcessError as e:
@@ -340,6 +535,36 @@ def install_single_package(package, python_exe=None):
 # try_alternative_requirements函数已移除，因为备用文件已被删除
 
 
+# 下载地址按(system, arch)直查，代替函数内的嵌套if/elif分支
+_CHROME_URL_SUFFIXES = {
+    ("windows", "x64"): "win64/chrome-win64.zip",
+    ("windows", "x32"): "win32/chrome-win32.zip",
+    ("linux", "x64"): "linux64/chrome-linux64.zip",
+    ("darwin", "arm64"): "mac-arm64/chrome-mac-arm64.zip",
+    ("darwin", "x64"): "mac-x64/chrome-mac-x64.zip",
+}
+
+# (URL后缀, 本地压缩包文件名)
+_CHROMEDRIVER_URLS = {
+    ("windows", "x64"): ("win64/chromedriver-win64.zip", "chromedriver-win64.zip"),
+    ("windows", "x32"): ("win32/chromedriver-win32.zip", "chromedriver-win32.zip"),
+    ("linux", "x64"): ("linux64/chromedriver-linux64.zip", "chromedriver-linux64.zip"),
+    ("darwin", "arm64"): ("mac-arm64/chromedriver-mac-arm64.zip", "chromedriver-mac.zip"),
+    ("darwin", "x64"): ("mac-x64/chromedriver-mac-x64.zip", "chromedriver-mac.zip"),
+}
+
+# 少见架构回退到各系统的默认包（与原有if/elif链的else分支行为一致）
+_DEFAULT_ARCH = {"windows": "x32", "linux": "x64", "darwin": "x64"}
+
+
+def _lookup_platform(table, system, arch):
+    """按(system, arch)查表，未命中时回退到该系统的默认架构"""
+    entry = table.get((system, arch))
+    if entry is None:
+        entry = table.get((system, _DEFAULT_ARCH.get(system)))
+    return entry
+
+
 def download_chrome(system, arch):
     """下载Chrome二进制版本到项目目录"""
     print(f"\n🌐 正在下载Chrome二进制版本 {CHROME_VERSION}...")
@@ -353,52 +578,45 @@ def download_chrome(system, arch):
 
     chrome_dir = browser_dir / "chrome"
 
-    if chrome_dir.exists() and any(chrome_dir.iterdir()):
-        chrome_exe = find_chrome_executable(chrome_dir, system)
-        if chrome_exe:
-            print("✅ Chrome浏览器已存在，跳过下载")
-            # macOS特殊处理：即使已存在也要确保权限正确
-            if system == "darwin":
-                setup_macos_chrome_permissions(chrome_exe)
-            return True, str(chrome_exe)
+    # 版本标记只在解压和权限设置全部成功后写入，
+    # 目录非空但没有标记说明上次安装中途失败，需要重新解压
+    version_marker = chrome_dir / ".version"
+    try:
+        if version_marker.read_text(encoding='utf-8').strip() == CHROME_VERSION:
+            chrome_exe = find_chrome_executable(chrome_dir, system)
+            if chrome_exe:
+                print("✅ Chrome浏览器已存在且版本匹配，跳过下载")
+                # macOS特殊处理：即使已存在也要确保权限正确
+                if system == "darwin":
+                    setup_macos_chrome_permissions(chrome_exe)
+                return True, str(chrome_exe)
+    except OSError:
+        pass
 
     try:
-        if system == "windows":
-            if arch == "x64":
-                url = f"{CHROME_BASE_URL}/win64/chrome-win64.zip"
-                chrome_zip = browser_dir / "chrome-win64.zip"
-            else:
-                url = f"{CHROME_BASE_URL}/win32/chrome-win32.zip"
-                chrome_zip = browser_dir / "chrome-win32.zip"
-        elif system == "linux":
-            url = f"{CHROME_BASE_URL}/linux64/chrome-linux64.zip"
-            chrome_zip = browser_dir / "chrome-linux64.zip"
-        elif system == "darwin":
-            if arch == "arm64":
-                url = f"{CHROME_BASE_URL}/mac-arm64/chrome-mac-arm64.zip"
-            else:
-                url = f"{CHROME_BASE_URL}/mac-x64/chrome-mac-x64.zip"
-            chrome_zip = browser_dir / "chrome-mac.zip"
-        else:
+        url_suffix = _lookup_platform(_CHROME_URL_SUFFIXES, system, arch)
+        if url_suffix is None:
             print(f"❌ 不支持的操作系统: {system}")
             return False, None
+        url = f"{CHROME_BASE_URL}/{url_suffix}"
 
-        if download_file(url, str(chrome_zip), f"Chrome {CHROME_VERSION} 二进制包"):
-            if extract_archive(str(chrome_zip), str(chrome_dir), f"Chrome {CHROME_VERSION}"):
-                chrome_zip.unlink()
-                chrome_exe = find_chrome_executable(chrome_dir, system)
-
-                if chrome_exe:
-                    # macOS特殊处理：设置权限和绕过Gatekeeper
-                    if system == "darwin":
-                        setup_macos_chrome_permissions(chrome_exe)
-
-                    print(f"✅ Chrome二进制版本安装完成: {chrome_exe}")
-                    print(f"   Chrome版本: {CHROME_VERSION}")
-                    return True, str(chrome_exe)
-                else:
-                    print("❌ 未找到Chrome可执行文件")
-                    return False, None
+        if download_and_extract_zip(url, str(chrome_dir), f"Chrome {CHROME_VERSION} 二进制包"):
+            chrome_exe = find_chrome_executable(chrome_dir, system)
+
+            if chrome_exe:
+                # macOS特殊处理：设置权限和绕过Gatekeeper
+                if system == "darwin":
+                    setup_macos_chrome_permissions(chrome_exe)
+
+                # 写入版本标记，下次运行据此跳过整个下载+解压阶段
+                version_marker.write_text(CHROME_VERSION, encoding='utf-8')
+
+                print(f"✅ Chrome二进制版本安装完成: {chrome_exe}")
+                print(f"   Chrome版本: {CHROME_VERSION}")
+                return True, str(chrome_exe)
+            else:
+                print("❌ 未找到Chrome可执行文件")
+                return False, None
 
     except Exception as e:
         print(f"❌ Chrome二进制版本下载失败: {e}")
@@ -407,6 +625,37 @@ def download_chrome(system, arch):
     return False, None
 
 
+def _strip_quarantine(root):
+    """递归移除com.apple.quarantine扩展属性
+
+    CPython暴露os.removexattr时直接在遍历中逐个删除，零子进程开销；
+    否则（标准macOS构建没有该接口）回退到一次xattr -rd子进程调用。
+    """
+    removexattr = getattr(os, 'removexattr', None)
+    if removexattr is None:
+        try:
+            subprocess.run([
+                "xattr", "-rd", "com.apple.quarantine", str(root)
+            ], check=False, capture_output=True)
+        except FileNotFoundError:
+            print("   ⚠️ xattr命令未找到，跳过Gatekeeper处理")
+        return
+
+    def _remove(path):
+        try:
+            removexattr(path, "com.apple.quarantine")
+        except OSError:
+            # 绝大多数文件本来就没有该属性（ENOATTR），直接忽略
+            pass
+
+    _remove(root)
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in dirnames:
+            _remove(os.path.join(dirpath, name))
+        for name in filenames:
+            _remove(os.path.join(dirpath, name))
+
+
 def setup_macos_chrome_permissions(chrome_exe_path):
     """为macOS Chrome设置必要的权限和绕过Gatekeeper"""
     print("🍎 设置macOS Chrome权限...")
@@ -421,18 +670,20 @@ def setup_macos_chrome_permissions(chrome_exe_path):
 
         # 2. 移除Gatekeeper的隔离属性（绕过安全检查）
         print(f"   移除Gatekeeper隔离属性: {chrome_app}")
-        try:
-            subprocess.run([
-                "xattr", "-rd", "com.apple.quarantine", str(chrome_app)
-            ], check=False, capture_output=True)
-        except FileNotFoundError:
-            print("   ⚠️ xattr命令未找到，跳过Gatekeeper处理")
+        _strip_quarantine(chrome_app)
 
-        # 3. 设置整个应用包的权限
+        # 3. 设置整个应用包的权限（直接在Python里遍历，
+        #    省掉chmod -R子进程的fork+exec和它的第二次全树遍历）
         print(f"   设置应用包权限: {chrome_app}")
-        subprocess.run([
-            "chmod", "-R", "755", str(chrome_app)
-        ], check=False, capture_output=True)
+        os.chmod(chrome_app, 0o755)
+        for dirpath, _dirnames, filenames in os.walk(chrome_app):
+            os.chmod(dirpath, 0o755)
+            for name in filenames:
+                try:
+                    os.chmod(os.path.join(dirpath, name), 0o755)
+                except OSError:
+                    # 单个文件失败不中断整体权限设置
+                    pass
 
         print("✅ macOS Chrome权限设置完成")
 
@@ -441,8 +692,28 @@ def setup_macos_chrome_permissions(chrome_exe_path):
         print("   程序将继续运行，如果遇到权限问题请手动设置")
 
 
+# Chrome for Testing压缩包的目录布局是确定的，按(system, arch)直查
+_CHROME_REL_PATHS = {
+    ("windows", "x64"): Path("chrome-win64") / "chrome.exe",
+    ("windows", "x32"): Path("chrome-win32") / "chrome.exe",
+    ("linux", "x64"): Path("chrome-linux64") / "chrome",
+    ("darwin", "arm64"): (Path("chrome-mac-arm64") / "Google Chrome for Testing.app"
+                          / "Contents" / "MacOS" / "Google Chrome for Testing"),
+    ("darwin", "x64"): (Path("chrome-mac-x64") / "Google Chrome for Testing.app"
+                        / "Contents" / "MacOS" / "Google Chrome for Testing"),
+}
+
+
 def find_chrome_executable(chrome_dir, system):
     """查找Chrome可执行文件"""
+    # 优先直查已知路径：一次stat代替几千个文件的全树扫描
+    rel_path = _CHROME_REL_PATHS.get((system, _ARCH))
+    if rel_path is not None:
+        candidate = chrome_dir / rel_path
+        if candidate.exists():
+            return candidate
+
+    # 目录布局不符合预期时才退回rglob全树扫描
     if system == "windows":
         for chrome_exe in chrome_dir.rglob("chrome.exe"):
             return chrome_exe
@@ -467,7 +738,7 @@ def find_chrome_executable(chrome_dir, system):
     return None
 
 
-def download_chromedriver_for_chrome(system, arch, chrome_path):
+def download_chromedriver_for_chrome(system, arch):
     """下载与Chrome 140.0.7339.80匹配的ChromeDriver"""
     print(f"\n🚗 正在下载匹配的ChromeDriver {CHROME_VERSION}...")
 
@@ -494,24 +765,12 @@ def download_chromedriver_for_chrome(system, arch, chrome_path):
 
     try:
         # 构造下载URL（使用Chrome for Testing的ChromeDriver）
-        if system == "windows":
-            if arch == "x64":
-                url = f"https://storage.googleapis.com/chrome-for-testing-public/{driver_version}/win64/chromedriver-win64.zip"
-                driver_zip = drivers_dir / "chromedriver-win64.zip"
-            else:
-                url = f"https://storage.googleapis.com/chrome-for-testing-public/{driver_version}/win32/chromedriver-win32.zip"
-                driver_zip = drivers_dir / "chromedriver-win32.zip"
-        elif system == "linux":
-            url = f"https://storage.googleapis.com/chrome-for-testing-public/{driver_version}/linux64/chromedriver-linux64.zip"
-            driver_zip = drivers_dir / "chromedriver-linux64.zip"
-        elif system == "darwin":
-            if arch == "arm64":
-                url = f"https://storage.googleapis.com/chrome-for-testing-public/{driver_version}/mac-arm64/chromedriver-mac-arm64.zip"
-            else:
-                url = f"https://storage.googleapis.com/chrome-for-testing-public/{driver_version}/mac-x64/chromedriver-mac-x64.zip"
-            driver_zip = drivers_dir / "chromedriver-mac.zip"
-        else:
+        entry = _lookup_platform(_CHROMEDRIVER_URLS, system, arch)
+        if entry is None:
             return False, None
+        url_suffix, zip_name = entry
+        url = f"https://storage.googleapis.com/chrome-for-testing-public/{driver_version}/{url_suffix}"
+        driver_zip = drivers_dir / zip_name
 
         # 下载并安装ChromeDriver
         return extract_and_install_chromedriver(url, driver_zip, drivers_dir, chromedriver_path, driver_version)
@@ -525,91 +784,107 @@ def download_chromedriver_for_chrome(system, arch, chrome_path):
 def extract_and_install_chromedriver(url, driver_zip, drivers_dir, chromedriver_path, version):
     """解压并安装ChromeDriver"""
     if download_file(url, str(driver_zip), "ChromeDriver"):
-        # 解压到临时目录
-        temp_extract = drivers_dir / "temp"
-        if extract_archive(str(driver_zip), str(temp_extract), "ChromeDriver"):
-            # 查找chromedriver文件
-            chromedriver_file = None
-            for file_path in temp_extract.rglob("chromedriver*"):
-                if file_path.is_file() and (file_path.name == "chromedriver" or file_path.name == "chromedriver.exe"):
-                    chromedriver_file = file_path
-                    break
+        try:
+            # 直接从压缩包中读出chromedriver成员写到最终位置，
+            # 不再经过temp目录的解压+move+rmtree三步
+            with zipfile.ZipFile(driver_zip) as zf:
+                driver_info = next(
+                    (info for info in zf.infolist()
+                     if not info.is_dir()
+                     and info.filename.rsplit('/', 1)[-1] in (
+                         "chromedriver", "chromedriver.exe")),
+                    None)
+
+                if driver_info is None:
+                    print("❌ 未找到chromedriver文件")
+                    return False, None
 
-            if chromedriver_file:
-                # 移动到正确位置
-                shutil.move(str(chromedriver_file), str(chromedriver_path))
+                with zf.open(driver_info) as src, \
+                        open(chromedriver_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
 
-                # 在Linux/macOS上设置执行权限
-                import os
-                if not str(chromedriver_path).endswith('.exe'):
-                    os.chmod(chromedriver_path, 0o755)
+            # 在Linux/macOS上设置执行权限
+            if not str(chromedriver_path).endswith('.exe'):
+                os.chmod(chromedriver_path, 0o755)
 
-                # 清理临时文件
-                driver_zip.unlink()
-                shutil.rmtree(temp_extract)
+            driver_zip.unlink()
 
-                print(f"✅ ChromeDriver安装完成: {chromedriver_path}")
-                print(f"   ChromeDriver版本: {version}")
-                return True, str(chromedriver_path)
-            else:
-                print("❌ 未找到chromedriver文件")
-                return False, None
+            print(f"✅ ChromeDriver安装完成: {chromedriver_path}")
+            print(f"   ChromeDriver版本: {version}")
+            return True, str(chromedriver_path)
+
+        except Exception as e:
+            print(f"❌ ChromeDriver解压失败: {e}")
+            return False, None
 
     return False, None
 
 
+def _find_binaries(root):
+    """一次DFS遍历root，同时定位Chrome和ChromeDriver
+
+    两个目标都找到时提前退出，避免对已解压的Chrome树做两次全量遍历。
+    """
+    found = {}
+    for dirpath, _dirnames, filenames in os.walk(root, followlinks=False):
+        for name in filenames:
+            name_lower = name.lower()
+            if ('chrome' not in found
+                    and ('chrome.exe' in name_lower or name == 'chrome')):
+                found['chrome'] = Path(dirpath) / name
+            elif ('chromedriver' not in found
+                    and name_lower.startswith('chromedriver')):
+                found['chromedriver'] = Path(dirpath) / name
+
+        if len(found) == 2:
+            break
+
+    return found
+
+
 def check_local_browsers():
     """检查本地下载的浏览器状态"""
     print("\n🔍 检查本地浏览器状态...")
 
-    bin_dir = Path("bin")
-    browser_dir = bin_dir / "browsers"
-    drivers_dir = bin_dir / "drivers"
+    binaries = _find_binaries(Path("bin"))
 
     # 检查Chrome
-    chrome_found = False
-    if browser_dir.exists():
-        for chrome_exe in browser_dir.rglob("chrome*"):
-            if chrome_exe.is_file() and ("chrome.exe" in chrome_exe.name.lower() or chrome_exe.name == "chrome"):
-                print(f"✅ 找到Chrome浏览器: {chrome_exe}")
-                chrome_found = True
-                break
-
-    if not chrome_found:
+    chrome_exe = binaries.get('chrome')
+    if chrome_exe:
+        print(f"✅ 找到Chrome浏览器: {chrome_exe}")
+    else:
         print("❌ 未找到本地Chrome浏览器")
 
     # 检查ChromeDriver
-    driver_found = False
-    if drivers_dir.exists():
-        for driver in drivers_dir.rglob("chromedriver*"):
-            if driver.is_file():
-                print(f"✅ 找到ChromeDriver: {driver}")
-                driver_found = True
-                break
-
-    if not driver_found:
+    driver = binaries.get('chromedriver')
+    if driver:
+        print(f"✅ 找到ChromeDriver: {driver}")
+    else:
         print("❌ 未找到本地ChromeDriver")
 
-    return chrome_found and driver_found
+    return bool(chrome_exe and driver)
 
 
+@functools.lru_cache(maxsize=1)
 def check_system_chrome():
-    """检查系统是否已安装Chrome（可选）"""
+    """检查系统是否已安装Chrome（可选）
+
+    系统Chrome的位置在进程生命周期内不变，结果缓存一次即可。
+    """
     print("\n🌐 检查系统Chrome浏览器（可选）...")
 
-    system = platform.system().lower()
     chrome_paths = []
 
-    if system == "windows":
+    if _IS_WINDOWS:
         chrome_paths = [
             r"C:\Program Files\Google\Chrome\Application\chrome.exe",
             r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
         ]
-    elif system == "darwin":  # macOS
+    elif _SYSTEM == "darwin":  # macOS
         chrome_paths = [
             "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
         ]
-    elif system == "linux":
+    elif _SYSTEM == "linux":
         chrome_paths = [
             "/usr/bin/google-chrome",
             "/usr/bin/google-chrome-stable",
@@ -617,7 +892,7 @@ def check_system_chrome():
         ]
 
     for path in chrome_paths:
-        if os.path.exists(path):
+        if os.path.isfile(path):
             print(f"✅ 系统Chrome已安装: {path}")
             return True
 
@@ -645,75 +920,29 @@ def merge_config_intelligently(existing_config, default_config):
     return merged
 
 
-def create_sample_config(chrome_path=None, chromedriver_path=None, venv_python=None):
-    """创建示例配置文件"""
-    print("\n⚙️  创建配置文件...")
-
-    # 创建config目录
-    config_dir = Path("config")
-    config_dir.mkdir(exist_ok=True)
-
-    config_path = config_dir / "config.json"
+def _load_config_or_default():
+    """读取现有配置文件并解析一次；不存在或损坏时返回空字典
 
-    # 如果配置文件已存在，智能更新并添加缺失配置项
+    返回的字典在整个安装流程中共享传递，各步骤直接在内存中修改，
+    最后由main()统一写回一次，避免每个步骤各自重复 读取+解析+写入。
+    """
+    config_path = Path("config") / "config.json"
     if config_path.exists():
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                existing_config = json.load(f)
-
-            # 创建完整的默认配置模板
-            default_config = {
-                "mteam": {
-                    "username": "your_mteam_username",
-                    "password": "your_mteam_password"
-                },
-                "gmail": {
-                    "email": "your_gmail@gmail.com",
-                    "password": "your_gmail_app_password",
-                    "method": "imap"
-                },
-                "email_management": {
-                    "delete_after_use": False,  # 是否在获取验证码后删除邮件
-                    "delete_wait_seconds": 5    # 删除前等待秒数
-                },
-                "anti_detection": {
-                    "enable_human_simulation": True,  # 是否启用人类行为模拟
-                    "random_delays": True,            # 是否使用随机延迟
-                    "typing_simulation": True         # 是否模拟真实打字
-                },
-                "headless": True,
-                "user_agent": f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{CHROME_VERSION} Safari/537.36"
-            }
-
-            # 智能合并配置：添加缺失的配置项，保留现有的用户设置
-            merged_config = merge_config_intelligently(
-                existing_config, default_config)
-
-            # 更新系统相关路径（总是使用最新的）
-            if chrome_path:
-                merged_config["chrome_binary_path"] = os.path.abspath(
-                    chrome_path)
-            if chromedriver_path:
-                merged_config["chromedriver_path"] = os.path.abspath(
-                    chromedriver_path)
-            if venv_python:
-                merged_config["venv_python"] = os.path.abspath(venv_python)
-
-            # 更新User-Agent到正确的Chrome版本
-            merged_config[
-                "user_agent"] = f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{CHROME_VERSION} Safari/537.36"
+            return json.loads(config_path.read_text(encoding='utf-8'))
+        except Exception as e:
+            print(f"⚠️ 读取现有配置文件失败，将重新生成: {e}")
+    return {}
 
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(merged_config, f, indent=4, ensure_ascii=False)
 
-            print("✅ 配置文件已智能更新，新增功能配置已添加")
-            return True
+def create_sample_config(config, chrome_path=None, chromedriver_path=None, venv_python=None):
+    """补全配置字典（只修改内存中的字典，写回由调用方统一处理）"""
+    print("\n⚙️  创建配置文件...")
 
-        except Exception as e:
-            print(f"⚠️ 更新配置文件失败，创建新的配置文件: {e}")
+    is_new = not config
 
-    # 创建新的配置文件
-    sample_config = {
+    # 完整的默认配置模板
+    default_config = {
         "mteam": {
             "username": "your_mteam_username",
             "password": "your_mteam_password"
@@ -723,6 +952,15 @@ def create_sample_config(chrome_path=None, chromedriver_path=None, venv_python=N
             "password": "your_gmail_app_password",
             "method": "imap"
         },
+        "email_management": {
+            "delete_after_use": False,  # 是否在获取验证码后删除邮件
+            "delete_wait_seconds": 5    # 删除前等待秒数
+        },
+        "anti_detection": {
+            "enable_human_simulation": True,  # 是否启用人类行为模拟
+            "random_delays": True,            # 是否使用随机延迟
+            "typing_simulation": True         # 是否模拟真实打字
+        },
         "headless": True,
         "user_agent": f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{CHROME_VERSION} Safari/537.36",
         "cache_cleanup": {
@@ -735,38 +973,39 @@ def create_sample_config(chrome_path=None, chromedriver_path=None, venv_python=N
         }
     }
 
-    # 添加本地浏览器路径（使用绝对路径）
+    if is_new:
+        # 全新配置：直接填入默认模板
+        config.update(default_config)
+    else:
+        # 智能合并配置：添加缺失的配置项，保留现有的用户设置
+        merged_config = merge_config_intelligently(config, default_config)
+        config.update(merged_config)
+
+    # 更新系统相关路径（总是使用最新的绝对路径）
     if chrome_path:
-        sample_config["chrome_binary_path"] = os.path.abspath(chrome_path)
+        config["chrome_binary_path"] = os.path.abspath(chrome_path)
     if chromedriver_path:
-        sample_config["chromedriver_path"] = os.path.abspath(chromedriver_path)
+        config["chromedriver_path"] = os.path.abspath(chromedriver_path)
     if venv_python:
-        sample_config["venv_python"] = os.path.abspath(venv_python)
+        config["venv_python"] = os.path.abspath(venv_python)
 
-    try:
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(sample_config, f, indent=4, ensure_ascii=False)
+    # 更新User-Agent到正确的Chrome版本
+    config[
+        "user_agent"] = f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{CHROME_VERSION} Safari/537.36"
+
+    if is_new:
         print("✅ 配置文件已创建: config.json")
-        return True
-    except Exception as e:
-        print(f"❌ 创建配置文件失败: {e}")
-        return False
+    else:
+        print("✅ 配置文件已智能更新，新增功能配置已添加")
+    return True
 
 
-def interactive_config():
-    """交互式配置"""
+def interactive_config(config):
+    """交互式配置（直接修改传入的配置字典）"""
     print("\n🎯 交互式配置检查...")
 
-    config_path = Path("config") / "config.json"
-    if not config_path.exists():
-        print("❌ 配置文件不存在，请先运行基本设置")
-        return False
-
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-    except:
-        print("❌ 读取配置文件失败")
+    if not config:
+        print("❌ 配置内容为空，请先运行基本设置")
         return False
 
     # 检查是否还是默认配置
@@ -817,14 +1056,8 @@ def interactive_config():
     if app_password:
         config["gmail"]["password"] = app_password
 
-    try:
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
-        print("✅ 配置已保存")
-        return True
-    except Exception as e:
-        print(f"❌ 保存配置失败: {e}")
-        return False
+    print("✅ 配置已更新")
+    return True
 
 
 def show_next_steps(venv_python=None):
@@ -848,7 +1081,7 @@ def show_next_steps(venv_python=None):
     if venv_python:
         print(f"   {venv_python} run.py")
         print("   或者:")
-        if platform.system().lower() == "windows":
+        if _IS_WINDOWS:
             print("   venv\\Scripts\\activate && python run.py")
         else:
             print("   source venv/bin/activate && python run.py")
@@ -894,20 +1127,39 @@ def main():
     # 在虚拟环境中安装Python依赖
     deps_ok = install_dependencies(venv_python if venv_ok else None)
 
-    # 自动下载Chrome浏览器
-    chrome_ok, chrome_path = download_chrome(system, arch)
-
-    # 自动下载匹配的ChromeDriver
-    driver_ok, chromedriver_path = download_chromedriver_for_chrome(
-        system, arch, chrome_path)
-
-    # 创建配置文件
+    # 预先创建目录结构，避免并行下载任务中的mkdir竞争
+    bin_dir = Path("bin")
+    bin_dir.mkdir(exist_ok=True)
+    (bin_dir / "browsers").mkdir(exist_ok=True)
+    (bin_dir / "drivers").mkdir(exist_ok=True)
+
+    # Chrome与ChromeDriver下载互不依赖，并行执行以重叠网络等待
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        chrome_future = executor.submit(download_chrome, system, arch)
+        driver_future = executor.submit(
+            download_chromedriver_for_chrome, system, arch)
+        chrome_ok, chrome_path = chrome_future.result()
+        driver_ok, chromedriver_path = driver_future.result()
+
+    # 配置只在这里解析一次，各步骤共享同一个字典，结束时统一写回
+    config = _load_config_or_default()
     config_ok = create_sample_config(
-        chrome_path, chromedriver_path, venv_python if venv_ok else None)
+        config, chrome_path, chromedriver_path, venv_python if venv_ok else None)
 
     # 交互式配置（可选）
     if config_ok:
-        interactive_config()
+        interactive_config(config)
+
+    # 统一写回配置文件（整个流程只有这一次磁盘写入）
+    try:
+        config_dir = Path("config")
+        config_dir.mkdir(exist_ok=True)
+        (config_dir / "config.json").write_text(
+            json.dumps(config, indent=4, ensure_ascii=False), encoding='utf-8')
+        print("💾 配置文件已保存: config/config.json")
+    except Exception as e:
+        print(f"❌ 保存配置文件失败: {e}")
+        config_ok = False
 
     # 显示安装结果
     print("\n" + "="*60)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+M-Team 自动登录工具 - 快速修复脚本
+
+检查config/config.json中缺失的配置项并补齐默认值，
+修复完成后重新运行主程序。
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# 优先使用orjson（C实现，解析比stdlib快数倍），未安装时退回stdlib json
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=4, ensure_ascii=False).encode('utf-8')
+
+CONFIG_PATH = Path("config") / "config.json"
+
+# 历史版本的配置文件可能缺少这些片段，修复时补齐默认值
+_DEFAULT_SECTIONS = {
+    "gmail": {
+        "method": "imap"
+    },
+    "email_management": {
+        "delete_after_use": False,
+        "delete_wait_seconds": 5
+    },
+    "cache_cleanup": {
+        "enabled": True,
+        "interval_days": 7,
+        "cleanup_browser_cache": True,
+        "cleanup_logs": True,
+        "keep_recent_logs_days": 3,
+        "last_cleanup": None
+    }
+}
+
+
+def _fill_missing(config):
+    """补齐缺失的配置片段，返回是否有改动"""
+    changed = False
+    for section, defaults in _DEFAULT_SECTIONS.items():
+        target = config.setdefault(section, {})
+        if not isinstance(target, dict):
+            continue
+        for key, value in defaults.items():
+            if key not in target:
+                target[key] = value
+                print(f"   + 补齐配置项: {section}.{key}")
+                changed = True
+    return changed
+
+
+def _save_config_atomic(config):
+    """原子写回配置文件：先写临时文件再os.replace替换"""
+    tmp = CONFIG_PATH.with_suffix(CONFIG_PATH.suffix + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(_json_dumps(config))
+    os.replace(tmp, CONFIG_PATH)
+
+
+def main():
+    """主函数"""
+    print("🔧 M-Team 自动登录工具 - 快速修复")
+    print("=" * 60)
+
+    if not CONFIG_PATH.exists():
+        print("❌ 配置文件不存在！")
+        print("请先运行 'python install.py' 创建配置文件")
+        return 1
+
+    try:
+        config = _json_loads(CONFIG_PATH.read_bytes())
+    except ValueError:
+        # stdlib的JSONDecodeError和orjson的解析错误都是ValueError
+        print("❌ 配置文件格式错误，请检查JSON语法")
+        return 1
+
+    print("🔍 检查配置文件...")
+    if _fill_missing(config):
+        try:
+            _save_config_atomic(config)
+            print("✅ 配置文件已修复")
+        except Exception as e:
+            print(f"❌ 保存配置文件失败: {e}")
+            return 1
+    else:
+        print("✅ 配置文件完整，无需修复")
+
+    print("\n🚀 重新运行主程序...")
+    print("=" * 60)
+    # 直接在当前进程里调用主程序，省掉第二个Python解释器的
+    # 冷启动（数百毫秒）和进程创建开销
+    try:
+        import run
+    except ImportError as e:
+        print(f"❌ 模块导入错误: {e}")
+        print("请安装所有依赖: pip install -r requirements.txt")
+        return 1
+
+    run.main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,37 +6,51 @@ M-Team 自动登录工具 - 主启动脚本
 
 import sys
 import os
-import json
+import time
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
 
+# 优先使用orjson（C实现，解析比stdlib快数倍），未安装时退回stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
 sys.path.insert(0, os.path.join(
     os.path.dirname(os.path.abspath(__file__)), 'src'))
 
 from src.mteam_login import MTeamLogin
 
-def get_last_run_time():
-    """获取上次运行时间"""
-    timestamp_file = "last_run.timestamp"
-    try:
-        if os.path.exists(timestamp_file):
-            with open(timestamp_file, 'r', encoding='utf-8') as f:
-                timestamp_str = f.read().strip()
-                return datetime.fromisoformat(timestamp_str)
-        return None
-    except Exception as e:
-        print(f"⚠️  读取上次运行时间时发生错误: {e}")
-        return None
+# 配置解析缓存：按(mtime_ns, size)判定是否可以复用上次解析结果，
+# 避免每次调度运行都重复open+json.load同一个小文件
+_CONFIG_CACHE = {}
+
+
+def _load_json_cached(path):
+    """读取并解析JSON文件，带mtime+size键的模块级缓存"""
+    st = os.stat(path)
+    entry = _CONFIG_CACHE.get(path)
+    if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+        return entry[2]
+
+    with open(path, 'rb') as f:
+        config = _json_loads(f.read())
+    _CONFIG_CACHE[path] = (st.st_mtime_ns, st.st_size, config)
+    return config
+
+
+# 上次运行时间直接用哨兵文件的mtime承载：
+# 读取是一次stat，写入是一次touch，不需要读写和解析ISO字符串
+_TIMESTAMP_FILE = "last_run.timestamp"
 
 
 def save_last_run_time():
-    """保存当前运行时间"""
-    timestamp_file = "last_run.timestamp"
+    """保存当前运行时间（touch哨兵文件刷新mtime）"""
     try:
-        current_time = datetime.now()
-        with open(timestamp_file, 'w', encoding='utf-8') as f:
-            f.write(current_time.isoformat())
+        Path(_TIMESTAMP_FILE).touch()
         return True
     except Exception as e:
         print(f"⚠️  保存运行时间时发生错误: {e}")
@@ -44,28 +58,54 @@ def save_last_run_time():
 
 
 def should_run_login():
-    """判断是否应该执行登录"""
-    last_run = get_last_run_time()
-    
-    if last_run is None:
+    """判断是否应该执行登录
+
+    判定本身只是一次stat加一个float比较；datetime对象只在
+    需要打印给人看的时候才构造。
+    """
+    try:
+        last_run_ts = os.stat(_TIMESTAMP_FILE).st_mtime
+    except FileNotFoundError:
         print("📅 首次运行，执行登录操作")
         return True
-    
-    current_time = datetime.now()
-    time_diff = current_time - last_run
-    
-    if time_diff >= timedelta(days=1):
-        print(f"📅 上次运行时间: {last_run.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"📅 已经过去 {time_diff.days} 天 {time_diff.seconds//3600} 小时，执行登录操作")
+    except Exception as e:
+        print(f"⚠️  读取上次运行时间时发生错误: {e}")
+        print("📅 按首次运行处理，执行登录操作")
+        return True
+
+    age_seconds = time.time() - last_run_ts
+    last_run_str = datetime.fromtimestamp(
+        last_run_ts).strftime('%Y-%m-%d %H:%M:%S')
+
+    if age_seconds >= 86400.0:
+        print(f"📅 上次运行时间: {last_run_str}")
+        print(
+            f"📅 已经过去 {int(age_seconds // 86400)} 天 {int(age_seconds % 86400 // 3600)} 小时，执行登录操作")
         return True
     else:
-        hours_left = 24 - (time_diff.total_seconds() / 3600)
-        print(f"📅 上次运行时间: {last_run.strftime('%Y-%m-%d %H:%M:%S')}")
+        hours_left = (86400.0 - age_seconds) / 3600
+        print(f"📅 上次运行时间: {last_run_str}")
         print(f"⏰ 距离上次运行不足1天，还需等待 {hours_left:.1f} 小时")
         print("⏭️  跳过本次登录操作")
         return False
 
 
+# 字段缺失的哨兵值：区分"键不存在"和值本身为None/空
+_MISSING = object()
+
+
+def _deep_get(d, path):
+    """沿着key路径走一遍嵌套字典，任意一层缺失返回_MISSING"""
+    current = d
+    for key in path:
+        if not isinstance(current, dict):
+            return _MISSING
+        current = current.get(key, _MISSING)
+        if current is _MISSING:
+            return _MISSING
+    return current
+
+
 def check_config():
     """检查配置文件是否存在和正确"""
     possible_config_paths = [
@@ -85,8 +125,7 @@ def check_config():
         return False
 
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        config = _load_json_cached(config_file)
 
         required_fields = [
             ("mteam", "username"),
@@ -96,21 +135,20 @@ def check_config():
         ]
 
         for field_path in required_fields:
-            current = config
-            for key in field_path:
-                if key not in current:
-                    print(f"❌ 配置文件缺少必要字段: {'.'.join(field_path)}")
-                    return False
-                current = current[key]
-
-            if isinstance(current, str) and current.startswith("your_"):
+            value = _deep_get(config, field_path)
+            if value is _MISSING:
+                print(f"❌ 配置文件缺少必要字段: {'.'.join(field_path)}")
+                return False
+
+            if isinstance(value, str) and value.startswith("your_"):
                 print(f"❌ 请修改配置文件中的 {'.'.join(field_path)} 字段")
                 return False
 
         print("✅ 配置文件检查通过")
         return True
 
-    except json.JSONDecodeError:
+    except ValueError:
+        # stdlib的JSONDecodeError和orjson的解析错误都是ValueError
         print("❌ 配置文件格式错误，请检查JSON语法")
         return False
     except Exception as e:
@@ -118,22 +156,18 @@ def check_config():
         return False
 
 
-def print_banner():
-    """打印程序标题"""
-    banner = """
+# 标题和使用说明在导入时编码一次，打印时整块写出：
+# 每次调度运行只有一次write系统调用，也没有重复的字符串编码
+_BANNER_BYTES = """
 ╔══════════════════════════════════════════════════════════════╗
 ║                    M-Team 自动登录工具                        ║
 ║                                                              ║
 ║  功能: 自动登录M-Team并处理邮箱验证码                          ║
 ║  支持: Gmail IMAP和Selenium两种获取验证码方式                  ║
 ╚══════════════════════════════════════════════════════════════╝
-    """
-    print(banner)
+    \n""".encode('utf-8')
 
-
-def show_usage():
-    """显示使用说明"""
-    usage = """
+_USAGE_BYTES = """
 📋 使用说明:
 
 1. 首次安装运行:
@@ -146,7 +180,7 @@ def show_usage():
 
 3. 编辑配置文件config/config.json:
    - 将 'your_mteam_username' 替换为真实的M-Team用户名
-   - 将 'your_mteam_password' 替换为真实的M-Team密码  
+   - 将 'your_mteam_password' 替换为真实的M-Team密码
    - 将 'your_gmail@gmail.com' 替换为真实的Gmail邮箱地址
    - 将 'your_gmail_app_password' 替换为Gmail应用专用密码
 
@@ -157,8 +191,28 @@ def show_usage():
    - 所有浏览器和驱动都会自动下载到 bin/ 目录中
    - 无需手动安装Chrome或配置系统环境
    - 如果浏览器出现问题，删除 bin/ 目录后重新运行 install.py
-    """
-    print(usage)
+    \n""".encode('utf-8')
+
+
+def _write_block(data):
+    """把预编码的文本块一次性写到stdout"""
+    buffer = getattr(sys.stdout, 'buffer', None)
+    if buffer is not None:
+        buffer.write(data)
+        sys.stdout.flush()
+    else:
+        # stdout被重定向/捕获时可能没有buffer属性
+        print(data.decode('utf-8'), end='')
+
+
+def print_banner():
+    """打印程序标题"""
+    _write_block(_BANNER_BYTES)
+
+
+def show_usage():
+    """显示使用说明"""
+    _write_block(_USAGE_BYTES)
 
 
 def main():
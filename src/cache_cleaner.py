@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存清理器，定期清理浏览器缓存和日志文件
+"""
+
+import os
+import re
+import shutil
+import logging
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# 优先使用orjson（C实现，解析比stdlib快数倍），未安装时退回stdlib json。
+# 两套实现统一成"字节进、字节出"的接口，读写都走二进制模式
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=4, ensure_ascii=False).encode('utf-8')
+
+# Chrome在系统临时目录里留下的目录名前缀；
+# str.startswith接受元组，一次C层调用完成全部前缀匹配
+_CHROME_TEMP_PREFIXES = ('chrome_', 'scoped_dir', '.com.google.Chrome')
+
+# 解析结果按(mtime_ns, size)缓存，同一配置文件重复加载时直接复用，
+# 免去重复的open+read+json解析；文件被外部修改后stat不匹配自动失效
+_CONFIG_CACHE: Dict[str, tuple] = {}
+
+
+def _load_json_cached(path) -> Dict[str, Any]:
+    """读取并解析JSON文件，带mtime+size键的模块级缓存
+
+    原始字节一并缓存，供_save_last_cleanup做单键原地补丁时复用。
+    """
+    key = os.fspath(path)
+    st = os.stat(key)
+    entry = _CONFIG_CACHE.get(key)
+    if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+        return entry[2]
+
+    with open(key, 'rb') as f:
+        raw = f.read()
+    data = _json_loads(raw)
+    _CONFIG_CACHE[key] = (st.st_mtime_ns, st.st_size, data, raw)
+    return data
+
+
+class CacheCleaner:
+    def __init__(self, config_file: str = None):
+        """
+        初始化缓存清理器
+
+        Args:
+            config_file: 配置文件路径
+        """
+        self.logger = logging.getLogger(__name__)
+
+        # 如果未指定配置文件，使用默认路径
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        if config_file is None:
+            config_file = os.path.join(
+                script_dir, '..', 'config', 'config.json')
+            # 标准化路径，确保跨平台兼容
+            config_file = os.path.normpath(config_file)
+
+        self.config_file = Path(config_file)
+        self.project_root = Path(script_dir).parent
+        self.config = self._load_config()
+        self.cleanup_config = self.config.get('cache_cleanup', {})
+        # 状态字典在一次进程生命周期内复用，清理动作执行后失效
+        self._status_cache = None
+        # last_cleanup只在加载时解析一次，should_cleanup和
+        # get_cleanup_status直接用datetime对象，不再各自重复ISO解析
+        self._last_cleanup_dt = self._parse_last_cleanup()
+        # 清理间隔同样只换算一次timedelta，判定和状态计算直接复用
+        self._interval_td = timedelta(
+            days=self.cleanup_config.get('interval_days', 7))
+        # should_cleanup的判定结果带60秒TTL缓存：判定粒度是天级，
+        # 编排方在短时间内反复询问时不必每次重算
+        self._should_cleanup_cached = None
+
+    def _parse_last_cleanup(self):
+        """把配置中的last_cleanup字符串解析为datetime（无效时返回None）"""
+        last_cleanup = self.cleanup_config.get('last_cleanup')
+        if not last_cleanup:
+            return None
+        try:
+            return datetime.fromisoformat(last_cleanup)
+        except ValueError:
+            self.logger.warning(f"上次清理时间格式错误: {last_cleanup}")
+            return None
+
+    def _load_config(self) -> Dict[str, Any]:
+        """加载配置文件（经过模块级解析缓存）"""
+        try:
+            return _load_json_cached(self.config_file)
+        except FileNotFoundError:
+            self.logger.warning(f"配置文件 {self.config_file} 不存在，使用默认清理配置")
+            return {}
+        except ValueError:
+            # stdlib的JSONDecodeError和orjson的解析错误都是ValueError
+            self.logger.error(f"配置文件 {self.config_file} 格式错误")
+            raise
+
+    def _save_config(self) -> bool:
+        """保存配置文件（写回last_cleanup等状态）
+
+        先写临时文件再os.replace原子替换：中途崩溃不会留下半截配置，
+        替换本身只是一次目录项重命名。
+        """
+        try:
+            tmp = self.config_file.with_suffix(
+                self.config_file.suffix + '.tmp')
+            with open(tmp, 'wb') as f:
+                f.write(_json_dumps(self.config))
+            os.replace(tmp, self.config_file)
+            # 写回后磁盘内容已变化，对应的解析缓存必须失效
+            _CONFIG_CACHE.pop(os.fspath(self.config_file), None)
+            return True
+        except Exception as e:
+            self.logger.error(f"保存配置文件失败: {e}")
+            return False
+
+    def _save_last_cleanup(self, ts: str) -> bool:
+        """只更新last_cleanup时直接在原始字节上打补丁
+
+        成功清理的唯一配置变更就是这一个键，对原文做一次正则替换
+        比把整个配置重新json.dumps一遍便宜得多，且完整保留用户的
+        原有格式。键不存在或原文不可用时退回完整写盘。
+        """
+        raw = None
+        entry = _CONFIG_CACHE.get(os.fspath(self.config_file))
+        if entry is not None and len(entry) > 3:
+            raw = entry[3]
+        if raw is None:
+            try:
+                with open(self.config_file, 'rb') as f:
+                    raw = f.read()
+            except OSError:
+                raw = None
+
+        if raw is not None:
+            patched, count = re.subn(
+                rb'"last_cleanup"\s*:\s*(?:"[^"]*"|null)',
+                f'"last_cleanup": "{ts}"'.encode('utf-8'),
+                raw, count=1)
+            if count == 1:
+                try:
+                    tmp = self.config_file.with_suffix(
+                        self.config_file.suffix + '.tmp')
+                    with open(tmp, 'wb') as f:
+                        f.write(patched)
+                    os.replace(tmp, self.config_file)
+                    _CONFIG_CACHE.pop(os.fspath(self.config_file), None)
+                    return True
+                except Exception as e:
+                    self.logger.error(f"保存配置文件失败: {e}")
+                    return False
+
+        return self._save_config()
+
+    def should_cleanup(self) -> bool:
+        """判断是否应该执行清理（结果缓存60秒）"""
+        cached = self._should_cleanup_cached
+        now_mono = time.monotonic()
+        if cached is not None and now_mono - cached[0] <= 60:
+            return cached[1]
+
+        if not self.cleanup_config.get('enabled', True):
+            result = False
+        elif self._last_cleanup_dt is None:
+            result = True
+        else:
+            result = (datetime.now() - self._last_cleanup_dt
+                      >= self._interval_td)
+
+        self._should_cleanup_cached = (now_mono, result)
+        return result
+
+    def get_cleanup_status(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        获取当前清理状态
+
+        Args:
+            refresh: 是否强制重新计算（默认复用缓存结果）
+        """
+        if not refresh and self._status_cache is not None:
+            return self._status_cache
+
+        last_cleanup = self.cleanup_config.get('last_cleanup')
+        next_cleanup = None
+
+        if self._last_cleanup_dt is not None:
+            next_cleanup = (
+                self._last_cleanup_dt + self._interval_td).isoformat()
+
+        self._status_cache = {
+            'enabled': self.cleanup_config.get('enabled', True),
+            'interval_days': self.cleanup_config.get('interval_days', 7),
+            'cleanup_browser_cache': self.cleanup_config.get('cleanup_browser_cache', True),
+            'cleanup_logs': self.cleanup_config.get('cleanup_logs', True),
+            'keep_recent_logs_days': self.cleanup_config.get('keep_recent_logs_days', 3),
+            'last_cleanup': last_cleanup,
+            'next_cleanup': next_cleanup,
+            'should_cleanup': self.should_cleanup()
+        }
+        return self._status_cache
+
+    def cleanup_browser_cache(self) -> bool:
+        """清理浏览器缓存和Chrome临时目录"""
+        self.logger.info("开始清理浏览器缓存...")
+        success = True
+
+        # 清理系统临时目录中的Chrome残留目录。
+        # 单次scandir代替逐pattern的glob：目录只读一遍，
+        # DirEntry自带文件类型信息，is_dir不需要额外stat
+        temp_dir = tempfile.gettempdir()
+
+        candidates = []
+        try:
+            with os.scandir(temp_dir) as it:
+                for entry in it:
+                    if not entry.name.startswith(_CHROME_TEMP_PREFIXES):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            candidates.append(entry.path)
+                    except OSError:
+                        pass
+        except Exception as e:
+            self.logger.warning(f"扫描临时目录失败: {e}")
+
+        # rmtree基本都耗在unlink系统调用上（GIL在系统调用期间释放），
+        # 多个目录交给线程池并行删除
+        removed_count = 0
+        if candidates:
+            def _remove_tree(path):
+                shutil.rmtree(path, ignore_errors=True)
+                self.logger.debug(f"已删除Chrome临时目录: {path}")
+
+            workers = min(8, (os.cpu_count() or 1) * 2, len(candidates))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(_remove_tree, candidates))
+            removed_count = len(candidates)
+
+        # 清理项目内的缓存目录
+        cache_dirs = [
+            self.project_root / 'cache',
+            self.project_root / 'temp',
+            self.project_root / 'bin' / 'drivers' / 'temp',
+        ]
+
+        for cache_dir in cache_dirs:
+            # isdir一次stat同时回答"存在"和"是目录"，
+            # 目录不存在的常见路径只花一个系统调用
+            path = os.fspath(cache_dir)
+            if os.path.isdir(path):
+                try:
+                    shutil.rmtree(path)
+                    removed_count += 1
+                    self.logger.info(f"已删除项目缓存目录: {path}")
+                except OSError as e:
+                    self.logger.warning(f"删除项目缓存目录失败 {path}: {e}")
+                    success = False
+
+        self.logger.info(f"浏览器缓存清理完成，共删除 {removed_count} 个目录")
+        self._status_cache = None
+        return success
+
+    def cleanup_logs(self) -> bool:
+        """清理过期的日志文件"""
+        self.logger.info("开始清理过期日志...")
+
+        logs_dir = self.project_root / 'logs'
+        if not logs_dir.exists():
+            self.logger.info("日志目录不存在，跳过日志清理")
+            return True
+
+        keep_days = self.cleanup_config.get('keep_recent_logs_days', 3)
+        # 截止时间换算成float时间戳只做一次，循环内直接比较st_mtime，
+        # 不再为每个文件构造datetime对象
+        cutoff_ts = (datetime.now() - timedelta(days=keep_days)).timestamp()
+        removed_count = 0
+        total_size = 0
+        # 汇总日志被关掉时（如WARNING级别运行）没人看得到释放量，
+        # 连累加都省掉
+        account_size = self.logger.isEnabledFor(logging.INFO)
+
+        try:
+            # scandir的DirEntry缓存stat结果：mtime和size一次系统调用拿到
+            with os.scandir(logs_dir) as it:
+                for entry in it:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+
+                    st = entry.stat()
+                    if st.st_mtime >= cutoff_ts:
+                        continue
+
+                    try:
+                        os.unlink(entry.path)
+                        removed_count += 1
+                        if account_size:
+                            total_size += st.st_size
+                        self.logger.debug(f"已删除过期日志: {entry.name}")
+                    except Exception as e:
+                        self.logger.warning(f"删除日志文件失败 {entry.path}: {e}")
+        except Exception as e:
+            self.logger.error(f"清理日志时发生错误: {e}")
+            return False
+
+        self.logger.info(
+            "日志清理完成，共删除 %d 个文件，释放 %.2f MB",
+            removed_count, total_size / 1024 / 1024)
+        self._status_cache = None
+        return True
+
+    def run_cleanup(self, force: bool = False) -> bool:
+        """
+        执行完整的清理流程
+
+        Args:
+            force: 是否忽略时间间隔强制清理
+
+        Returns:
+            bool: 清理是否成功
+        """
+        if not force and not self.should_cleanup():
+            self.logger.info("距离上次清理时间不足，跳过本次清理")
+            return False
+
+        success = True
+
+        if self.cleanup_config.get('cleanup_browser_cache', True):
+            if not self.cleanup_browser_cache():
+                success = False
+
+        if self.cleanup_config.get('cleanup_logs', True):
+            if not self.cleanup_logs():
+                success = False
+
+        # 记录本次清理时间（同步更新已解析的datetime缓存）
+        now = datetime.now()
+        self.config.setdefault('cache_cleanup', {})[
+            'last_cleanup'] = now.isoformat()
+        self.cleanup_config = self.config['cache_cleanup']
+        self._last_cleanup_dt = now
+        if not self._save_last_cleanup(now.isoformat()):
+            self.logger.warning("清理时间写回配置文件失败")
+
+        self._status_cache = None
+        # last_cleanup刚更新，之前缓存的判定结果作废
+        self._should_cleanup_cached = None
+        return success
+
+    def force_cleanup(self) -> bool:
+        """强制执行完整清理（忽略时间间隔）"""
+        return self.run_cleanup(force=True)
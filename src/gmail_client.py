@@ -6,14 +6,125 @@ Gmail 客户端，用于自动获取验证码（仅使用IMAP方法）
 
 import time
 import re
+import asyncio
+import atexit
+import heapq
 import logging
+import random
+import socket
 from typing import Optional
 from datetime import datetime, timedelta
 import imaplib
 import email
-from email.header import decode_header
+import quopri
+from email import policy
+from email.parser import BytesHeaderParser
 import ssl
 
+# 头部专用解析器：只解析头部行，不构建MIME树和附件元数据，
+# 比message_from_bytes便宜得多——打分/日志路径只需要From/Subject/Date。
+# default策略（而非遗留的compat32）直接返回RFC 2047解码好的str，
+# 不用再手动过decode_header
+_HEADER_PARSER = BytesHeaderParser(policy=policy.default)
+
+# SSL上下文在模块加载时创建一次：create_default_context每次调用
+# 都会从磁盘重读系统CA证书链（可达数MB），没必要进热路径。
+# 共享上下文还让OpenSSL的TLS会话票据跨重连生效，重握手少一个RTT。
+# 默认配置即完整校验（含主机名）——imap.gmail.com的证书是有效的，
+# 没有理由关掉check_hostname
+_SSL_CTX = ssl.create_default_context()
+
+# 优先使用re2（线性时间DFA，无回溯，对恶意构造的超长正文免疫
+# ReDoS），未安装时退回stdlib re。re2不支持回溯引用和环视，
+# 逐个模式尝试，编译不了的自动落回re
+try:
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
+
+def _compile(pattern, flags=0):
+    if _re2 is not None:
+        try:
+            return _re2.compile(pattern, flags)
+        except Exception:
+            pass
+    return re.compile(pattern, flags)
+
+
+# 验证码提取分两步：一趟C层扫描把所有4-8位数字串连位置一起取出，
+# 再在Python侧按优先级过滤——提示词（验证码/code）邻近的优先，
+# 其次6位纯数字。比交替大正则少走很多NFA分支
+_DIGITS_RE = _compile(r'\d{4,8}')
+_CTX_RE = _compile(r'验证码|verification code|code[：: ]', re.IGNORECASE)
+
+# 提示词结束位置到验证码起始位置允许的最大间隔（字符数）
+_CTX_WINDOW = 40
+
+# 正文里完全没有数字串时，才用提示词+字母数字的兜底模式
+_ALNUM_CODE_RE = _compile(
+    r'(?:验证码|verification code)[：:\s]*([A-Za-z0-9]{4,8})', re.IGNORECASE)
+
+# 原始字节上的6位数字预扫：M-Team压倒性常见的就是一个独立6位码，
+# 在bytes上命中即省掉整段UTF-8解码。前后环视排除粘在字母、
+# 域名或更长数字串里的片段
+_SIX_DIGITS_BYTES_RE = _compile(rb'(?<![A-Za-z@.\d])(\d{6})(?![A-Za-z@.\d])')
+
+# HTML邮件里常见的误匹配词
+_FALSE_POSITIVE_CODES = frozenset(
+    ['image', 'style', 'class', 'width', 'height', 'color'])
+
+# HTML转纯文本：先整块移除script/style，再把剩余标签替换为空格
+_SCRIPT_STYLE_RE = _compile(
+    r'<(script|style)[^>]*>.*?</\1>', re.DOTALL | re.IGNORECASE)
+_TAG_RE = _compile(r'<[^>]+>')
+
+
+def _html_to_text(html: str) -> str:
+    """把HTML正文粗略转成纯文本，供验证码正则匹配"""
+    return _TAG_RE.sub(' ', _SCRIPT_STYLE_RE.sub(' ', html))
+
+
+# 从FETCH响应的元信息行里取出邮件UID
+_UID_RE = _compile(rb'UID (\d+)')
+
+
+# 合并搜索词：一条OR表达式就覆盖原先的多轮串行SEARCH。
+# imaplib以ASCII发送命令，非ASCII搜索词（如SUBJECT "验证"）
+# 根本发不出去——旧条件列表里的中文项从未真正执行过，
+# 因此这里只保留能生效的ASCII词
+_SEARCH_TERMS = (
+    'SUBJECT "verification"',
+    'SUBJECT "code"',
+    'FROM "m-team"',
+    'FROM "mteam"',
+    'BODY "verification code"',
+)
+
+
+def _or_criteria(terms):
+    """把多个搜索词归并成IMAP的二叉OR前缀表达式"""
+    expr = f'({terms[0]})'
+    for term in terms[1:]:
+        expr = f'(OR {expr} ({term}))'
+    return expr
+
+
+# OR表达式是常量，模块加载时拼好，不在每轮搜索里重建
+_SEARCH_OR_EXPR = _or_criteria(_SEARCH_TERMS)
+
+# RFC 3501规定的SEARCH日期字面量格式（如29-Aug-2026）
+_IMAP_DATE_FMT = "%d-%b-%Y"
+
+
+def _imap_date(dt: datetime) -> str:
+    """把datetime格式化成IMAP SEARCH要求的日期字面量
+
+    imaplib不做类型转换，日期必须手动按RFC 3501格式拼进条件串；
+    集中在一处格式化，避免各搜索入口各写一遍strftime。
+    """
+    return dt.strftime(_IMAP_DATE_FMT)
+
 
 class GmailClient:
     def __init__(self, config: dict):
@@ -27,6 +138,176 @@ class GmailClient:
         self.gmail_config = config.get("gmail", {})
         # 使用根logger确保日志正常输出
         self.logger = logging.getLogger()
+        # IMAP连接跨调用复用：TLS握手+LOGIN只付一次成本，
+        # 同进程内的后续调用只需一个NOOP确认连接仍然存活
+        self._mail = None
+        self._conn_key = None
+        self._conn_last_used = 0.0
+        # UID水位线：UID在邮箱内单调递增，记住见过的最大值后，
+        # 后续搜索只要"UID 水位线+1:*"就天然排除旧邮件，
+        # 不再需要抓回每封邮件解析Date头做客户端过滤
+        self._last_seen_uid = 0
+        # 水位线只在同一个UIDVALIDITY世代内有意义：邮箱重建时
+        # 服务器会换UIDVALIDITY，届时水位线必须清零重来
+        self._uidvalidity = None
+        # 搜索结果的短TTL缓存：同进程内短时间重复调用（用户连点
+        # 登录、cron立即重试）直接复用上一轮的结果，不再对同一个
+        # 日期范围重发整组SEARCH
+        self._search_cache = {}
+        atexit.register(self.close)
+
+    # 缓存连接的空闲TTL：Gmail会掐断长时间空闲的IMAP连接，
+    # 超过这个时间直接重建比在半死的socket上等NOOP超时快
+    _CONN_IDLE_TTL = 5 * 60
+
+    # 距上次使用不到这个秒数的连接跳过NOOP存活检查，省一个RTT
+    _CONN_FRESH_SECONDS = 5.0
+
+    # 整轮连接失败后的冷却时间：Gmail对频繁连接有按IP限流，
+    # 失败后马上再捶一轮只会把临时限流捶成长时间封禁。
+    # 只有失败才触发冷却，正常重连不受影响（类属性，进程内共享）
+    _CONNECT_COOLDOWN = 60.0
+    _last_connect_failure = 0.0
+
+    def _get_connection(self):
+        """获取可复用的IMAP连接，失效或配置变更时重建
+
+        Returns:
+            已完成认证的imaplib.IMAP4_SSL连接
+        """
+        conn_key = (self.gmail_config.get("email"),
+                    self.gmail_config.get("password"))
+
+        # 缓存命中：刚用过的连接直接复用；空闲超TTL的主动丢弃；
+        # 其余用一个NOOP确认还活着
+        if self._mail is not None and self._conn_key == conn_key:
+            idle_seconds = time.monotonic() - self._conn_last_used
+            if idle_seconds < self._CONN_FRESH_SECONDS:
+                self._conn_last_used = time.monotonic()
+                return self._mail
+            if idle_seconds >= self._CONN_IDLE_TTL:
+                self.logger.debug(
+                    f"IMAP连接空闲 {idle_seconds:.0f}s 超过TTL，重新建立")
+                self.close()
+            else:
+                try:
+                    self._mail.noop()
+                    self._conn_last_used = time.monotonic()
+                    self.logger.debug("复用已有的IMAP连接")
+                    return self._mail
+                except (imaplib.IMAP4.abort, imaplib.IMAP4.error, OSError, ssl.SSLError):
+                    self.logger.info("缓存的IMAP连接已失效，重新建立连接")
+                    self._mail = None
+        elif self._mail is not None:
+            # 账号配置变了，旧连接不能再用
+            self.close()
+
+        # 连接到Gmail IMAP服务器（增强稳定性）
+        self.logger.info(
+            f"正在连接Gmail IMAP服务器 (邮箱: {self.gmail_config['email'][:3]}***{self.gmail_config['email'][-10:]})")
+
+        # 复用模块级SSL上下文
+        context = _SSL_CTX
+
+        # 上一轮连接彻底失败后进入冷却，等完剩余时间再试
+        cooldown_left = (self._CONNECT_COOLDOWN
+                         - (time.monotonic() - GmailClient._last_connect_failure))
+        if GmailClient._last_connect_failure and cooldown_left > 0:
+            self.logger.info(
+                f"距上次连接失败不足{self._CONNECT_COOLDOWN:.0f}秒，"
+                f"冷却 {cooldown_left:.1f}s 后重试...")
+            time.sleep(cooldown_left)
+
+        # 重试采用带抖动的指数退避（1s/2s/4s+随机抖动），
+        # 固定短间隔的连环重试容易触发服务器端限流
+        max_retries = 4
+        mail = None
+
+        for retry in range(max_retries):
+            try:
+                self.logger.info(f"尝试连接 (第{retry + 1}/{max_retries}次)...")
+                # 带socket超时：网络异常时快速失败，不会无限期挂起
+                mail = imaplib.IMAP4_SSL(
+                    "imap.gmail.com", 993, ssl_context=context, timeout=15)
+                break
+            except (ssl.SSLError, OSError) as conn_error:
+                self.logger.warning(f"连接尝试{retry + 1}失败: {conn_error}")
+                if retry < max_retries - 1:
+                    time.sleep(min(30, 2 ** retry) + random.uniform(0, 0.5))
+                    continue
+                GmailClient._last_connect_failure = time.monotonic()
+                raise conn_error
+
+        if not mail:
+            GmailClient._last_connect_failure = time.monotonic()
+            raise Exception("无法建立IMAP连接")
+
+        self._enable_keepalive(mail)
+        self.logger.info("✅ Gmail IMAP服务器连接成功")
+
+        # 登录：单次尝试即可——瞬时SSL错误通常是缺socket超时导致的
+        # 假死，上面的timeout=15已经解决；认证失败重试也不会变成功
+        self.logger.info("正在进行IMAP认证...")
+        try:
+            mail.login(self.gmail_config["email"], self.gmail_config["password"])
+            self.logger.info("✅ Gmail IMAP认证成功")
+        except imaplib.IMAP4.error as login_error:
+            error_msg = str(login_error)
+            self.logger.error(f"❌ Gmail IMAP认证失败: {error_msg}")
+
+            if "AUTHENTICATIONFAILED" in error_msg:
+                self.logger.error("🔍 认证失败原因分析:")
+                self.logger.error("   1. 应用专用密码可能已过期，请重新生成")
+                self.logger.error(
+                    "   2. 访问: https://myaccount.google.com/apppasswords")
+                self.logger.error("   3. 删除旧密码，创建新的'M-Team自动登录'密码")
+                self.logger.error("   4. 确保两步验证已启用")
+            elif "Invalid credentials" in error_msg:
+                self.logger.error("🔍 无效凭据 - 请检查:")
+                self.logger.error("   • 应用专用密码格式是否正确")
+                self.logger.error("   • 是否复制了完整的16位密码")
+
+            raise login_error
+
+        self._mail = mail
+        self._conn_key = conn_key
+        self._conn_last_used = time.monotonic()
+        return mail
+
+    def _enable_keepalive(self, mail):
+        """在IMAP socket上开启TCP keepalive
+
+        NAT/防火墙会悄悄丢弃空闲几分钟的连接，IDLE挂起时尤其明显；
+        keepalive让内核每30秒探活，死连接在一分钟内被发现，
+        不用等下一次应用层读超时才触发昂贵的TLS重连。
+        精细参数(KEEPIDLE等)只有Linux有，逐项hasattr保护。
+        """
+        try:
+            sock = mail.socket()
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for opt, value in (('TCP_KEEPIDLE', 30),
+                               ('TCP_KEEPINTVL', 10),
+                               ('TCP_KEEPCNT', 3)):
+                if hasattr(socket, opt):
+                    sock.setsockopt(socket.IPPROTO_TCP,
+                                    getattr(socket, opt), value)
+        except OSError as e:
+            self.logger.debug(f"设置TCP keepalive失败: {e}")
+
+    def close(self):
+        """关闭缓存的IMAP连接（进程退出时由atexit调用）"""
+        if self._mail is None:
+            return
+        try:
+            self._mail.close()
+        except Exception:
+            pass
+        try:
+            self._mail.logout()
+        except Exception:
+            pass
+        self._mail = None
+        self._conn_key = None
 
     def get_verification_code_via_imap(self, timeout: int = 300, sent_after_time: float = None) -> Optional[str]:
         """
@@ -40,93 +321,50 @@ class GmailClient:
             验证码字符串，如果未找到则返回None
         """
         try:
-            # 连接到Gmail IMAP服务器（增强稳定性）
-            self.logger.info(
-                f"正在连接Gmail IMAP服务器 (邮箱: {self.gmail_config['email'][:3]}***{self.gmail_config['email'][-10:]})")
-
-            # 创建更稳定的SSL上下文
-            context = ssl.create_default_context()
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_REQUIRED
-
-            # 添加重试机制用于连接
-            max_retries = 3
-            mail = None
-
-            for retry in range(max_retries):
-                try:
-                    self.logger.info(f"尝试连接 (第{retry + 1}/{max_retries}次)...")
-                    mail = imaplib.IMAP4_SSL(
-                        "imap.gmail.com", 993, ssl_context=context)
-                    break
-                except (ssl.SSLError, OSError) as conn_error:
-                    self.logger.warning(f"连接尝试{retry + 1}失败: {conn_error}")
-                    if retry < max_retries - 1:
-                        time.sleep(2)  # 等待2秒后重试
-                        continue
-                    else:
-                        raise conn_error
-
-            if not mail:
-                raise Exception("无法建立IMAP连接")
-
-            self.logger.info("✅ Gmail IMAP服务器连接成功")
-
-            # 登录（带重试机制）
-            self.logger.info("正在进行IMAP认证...")
-            max_auth_retries = 2
-
-            for auth_retry in range(max_auth_retries):
-                try:
-                    mail.login(self.gmail_config["email"], self.gmail_config["password"])
-                    self.logger.info("✅ Gmail IMAP认证成功")
-                    break
-                except imaplib.IMAP4.error as login_error:
-                    error_msg = str(login_error)
-
-                    if auth_retry < max_auth_retries - 1 and "SSL" in error_msg:
-                        self.logger.warning(
-                            f"认证尝试{auth_retry + 1}失败，可能是网络问题，2秒后重试...")
-                        time.sleep(2)
-                        continue
-
-                    # 最后一次失败，提供详细诊断
-                    self.logger.error(f"❌ Gmail IMAP认证失败: {error_msg}")
-
-                    if "AUTHENTICATIONFAILED" in error_msg:
-                        self.logger.error("🔍 认证失败原因分析:")
-                        self.logger.error("   1. 应用专用密码可能已过期，请重新生成")
-                        self.logger.error(
-                            "   2. 访问: https://myaccount.google.com/apppasswords")
-                        self.logger.error("   3. 删除旧密码，创建新的'M-Team自动登录'密码")
-                        self.logger.error("   4. 确保两步验证已启用")
-                    elif "Invalid credentials" in error_msg:
-                        self.logger.error("🔍 无效凭据 - 请检查:")
-                        self.logger.error("   • 应用专用密码格式是否正确")
-                        self.logger.error("   • 是否复制了完整的16位密码")
-
-                    raise login_error
+            mail = self._get_connection()
 
             # 选择收件箱
             mail.select("inbox")
 
+            # UIDVALIDITY变了说明服务器重建过邮箱，旧UID全部作废，
+            # 水位线和搜索缓存一并清零
+            try:
+                _, uv_data = mail.response('UIDVALIDITY')
+                uidvalidity = int(uv_data[0]) if uv_data and uv_data[0] else None
+            except (ValueError, TypeError, IndexError):
+                uidvalidity = None
+            if uidvalidity != self._uidvalidity:
+                if self._uidvalidity is not None:
+                    self.logger.info("邮箱UIDVALIDITY已变更，重置UID水位线")
+                    self._last_seen_uid = 0
+                    self._search_cache.clear()
+                self._uidvalidity = uidvalidity
+
             # 设置搜索时间范围
             if sent_after_time:
                 # 使用指定的发送时间，往前推2分钟确保不遗漏，并且考虑邮件延迟
                 search_datetime = datetime.fromtimestamp(
                     sent_after_time - 120)  # 往前推2分钟
-                search_time = search_datetime.strftime("%d-%b-%Y")
+                search_time = _imap_date(search_datetime)
                 self.logger.info(
                     f"搜索 {search_datetime.strftime('%Y-%m-%d %H:%M:%S')} 之后的邮件")
             else:
                 # 默认搜索最近5分钟，给邮件更多到达时间
-                search_time = (datetime.now() -
-                               timedelta(minutes=5)).strftime("%d-%b-%Y")
+                search_time = _imap_date(datetime.now() - timedelta(minutes=5))
 
-            start_time = time.time()
+            # 超时用单调时钟的预计算deadline：不受NTP校时跳变影响，
+            # 每轮循环也只剩一次clock读取和一个float比较
+            start_time = time.monotonic()
+            deadline = start_time + timeout
             search_attempt = 0
             max_attempts = 5
 
+            # 服务器支持IDLE时用推送等待新邮件：验证码到达的瞬间被唤醒，
+            # 不支持时才退回固定间隔轮询
+            supports_idle = 'IDLE' in getattr(mail, 'capabilities', ())
+            if supports_idle:
+                self.logger.info("服务器支持IMAP IDLE，使用推送模式等待新邮件")
+
             # 添加邮箱状态检查
             try:
                 status, message_count = mail.select("inbox")
@@ -134,140 +372,90 @@ class GmailClient:
             except:
                 pass
 
-            while time.time() - start_time < timeout and search_attempt < max_attempts:
+            # IDLE模式下搜索由新邮件事件驱动，轮询模式才受次数限制
+            while (time.monotonic() < deadline
+                   and (supports_idle or search_attempt < max_attempts)):
                 search_attempt += 1
-                elapsed_time = time.time() - start_time
+                elapsed_time = time.monotonic() - start_time
                 self.logger.info(
-                    f"第{search_attempt}/{max_attempts}次搜索邮件... (已用时 {elapsed_time:.1f}s/{timeout}s)")
+                    f"第{search_attempt}次搜索邮件... (已用时 {elapsed_time:.1f}s/{timeout}s)")
 
-                # 首次搜索时，检查最新邮件情况
-                if search_attempt == 1:
+                # 首次搜索时检查最新邮件情况——纯调试信息，只在DEBUG
+                # 级别才执行。条件限定SINCE：'ALL'在大邮箱上会传回
+                # 几十万个UID（数百KB的ASCII列表），只为打印最后5个
+                if (search_attempt == 1
+                        and self.logger.isEnabledFor(logging.DEBUG)):
                     try:
-                        # 获取最新的5封邮件进行调试
-                        status, all_messages = mail.search(None, 'ALL')
+                        status, all_messages = mail.search(
+                            None, f'SINCE "{search_time}"')
                         if status == 'OK' and all_messages[0]:
                             all_ids = all_messages[0].split()
                             recent_ids = all_ids[-5:] if len(
                                 all_ids) >= 5 else all_ids
-                            self.logger.info(
+                            self.logger.debug(
                                 f"邮箱中最新5封邮件ID: {[id.decode() for id in recent_ids]}")
                     except Exception as debug_error:
                         self.logger.debug(f"调试信息获取失败: {debug_error}")
 
-                # 进行快速的双重搜索（解决邮件到达时序问题）
-                for search_round in range(2):
-                    if search_round == 1:
-                        # 第二轮搜索前等待1秒，确保新邮件被服务器索引
-                        time.sleep(1)
-                        self.logger.debug("进行第二轮快速搜索...")
+                candidate_ids = self._search_candidates(mail, search_time)
 
-                    try:
-                        # 渐进式搜索策略：从最精确到最宽泛
-                        search_criteria = [
-                            # 第一优先级：最新的验证码相关邮件（不限未读状态）
-                            f'(SINCE "{search_time}") (SUBJECT "验证" OR SUBJECT "verification" OR SUBJECT "code" OR SUBJECT "驗證")',
-                            f'(SINCE "{search_time}") (BODY "验证码" OR BODY "verification code" OR BODY "驗證碼")',
-
-                            # 第二优先级：M-Team相关邮件
-                            f'(SINCE "{search_time}") (FROM "m-team" OR SUBJECT "m-team" OR BODY "m-team")',
-                            f'(SINCE "{search_time}") (FROM "mteam" OR SUBJECT "mteam" OR BODY "mteam")',
-
-                            # 第三优先级：常见PT站发送地址（精确匹配）
-                            f'(SINCE "{search_time}") (FROM "web@m-team.cc" OR FROM "noreply@m-team.cc" OR FROM "admin@m-team.cc")',
-                            f'(SINCE "{search_time}") (FROM "no-reply@m-team.cc" OR FROM "service@m-team.cc" OR FROM "system@m-team.cc")',
-                            f'(SINCE "{search_time}") (FROM "@m-team.cc")',
-
-                            # 第四优先级：任何包含数字验证码的邮件
-                            f'(SINCE "{search_time}") (BODY "\\d{{6}}" OR BODY "\\d{{4}}")',
-
-                            # 第五优先级：所有最新邮件（时间范围内）
-                            f'(SINCE "{search_time}")',
-
-                            # 第六优先级：放宽时间的验证码搜索
-                            '(SUBJECT "验证" OR SUBJECT "verification" OR SUBJECT "code" OR SUBJECT "驗證")',
-                            '(BODY "验证码" OR BODY "verification code" OR BODY "驗證碼")',
-
-                            # 最后：所有未读邮件（作为兜底）
-                            'UNSEEN'
-                        ]
-
-                        for i, criteria in enumerate(search_criteria):
-                            try:
-                                self.logger.debug(
-                                    f"使用搜索条件 {i+1}/{len(search_criteria)}: {criteria}")
-                                status, messages = mail.search(None, criteria)
-                                if status == 'OK' and messages[0]:
-                                    message_ids = messages[0].split()
-                                    if message_ids:
-                                        self.logger.info(
-                                            f"搜索条件 {i+1} 找到 {len(message_ids)} 封邮件")
-
-                                        # 处理所有找到的邮件，从最新的开始
-                                        # 从最新的邮件开始处理
-                                        for msg_id in reversed(message_ids):
-                                            self.logger.debug(
-                                                f"检查邮件ID: {msg_id}")
-                                            verification_code = self._extract_code_from_email(
-                                                mail, msg_id, sent_after_time)
-                                            if verification_code:
-                                                self.logger.info(
-                                                    f"✅ 成功从邮件 {msg_id} 中提取验证码: {verification_code}")
-
-                                                # 根据配置决定是否删除邮件
-                                                email_config = self.config.get(
-                                                    'email_management', {})
-                                                if email_config.get('delete_after_use', False):
-                                                    try:
-                                                        wait_time = email_config.get(
-                                                            'delete_wait_seconds', 5)
-                                                        self.logger.info(
-                                                            f"等待{wait_time}秒后删除验证码邮件...")
-                                                        time.sleep(wait_time)
-                                                        self._delete_email_safely(
-                                                            mail, msg_id)
-                                                    except Exception as delete_error:
-                                                        self.logger.warning(
-                                                            f"删除邮件失败: {delete_error}")
-                                                else:
-                                                    self.logger.info(
-                                                        "📧 邮件删除功能已禁用，验证码邮件将保留")
-
-                                                mail.close()
-                                                mail.logout()
-                                                return verification_code
-
-                                        self.logger.debug(
-                                            f"搜索条件 {i+1} 的所有邮件都未包含有效验证码")
-                                else:
-                                    self.logger.debug(f"搜索条件 {i+1} 未找到邮件")
-                            except Exception as e:
-                                self.logger.debug(f"搜索条件 {i+1} 执行失败: {e}")
-                                continue
-
-                    except Exception as search_error:
-                        self.logger.error(
-                            f"第{search_round + 1}轮搜索过程中发生错误: {search_error}")
-                        continue
+                # 所有候选邮件一次批量抓取，从最新的开始提取
+                found = self._extract_codes_from_messages(mail, candidate_ids)
+                if found:
+                    msg_id, verification_code = found
+                    self.logger.info(
+                        f"✅ 成功从邮件 {msg_id} 中提取验证码: {verification_code}")
+
+                    # 根据配置决定是否删除邮件
+                    email_config = self.config.get(
+                        'email_management', {})
+                    if email_config.get('delete_after_use', False):
+                        try:
+                            wait_time = email_config.get(
+                                'delete_wait_seconds', 5)
+                            self.logger.info(
+                                f"等待{wait_time}秒后删除验证码邮件...")
+                            time.sleep(wait_time)
+                            self._delete_email_safely(mail, msg_id)
+                        except Exception as delete_error:
+                            self.logger.warning(
+                                f"删除邮件失败: {delete_error}")
+                    else:
+                        self.logger.info(
+                            "📧 邮件删除功能已禁用，验证码邮件将保留")
+
+                    # 连接保留给下次调用复用，不logout
+                    return verification_code
+
+                if candidate_ids:
+                    self.logger.debug("候选邮件中均未找到有效验证码")
 
-                # 两轮搜索都没找到，动态等待后重试
-                remaining_time = timeout - (time.time() - start_time)
-                if remaining_time > 5 and search_attempt < max_attempts:  # 确保有足够时间进行下次搜索
+                # 没找到验证码：IDLE等待新邮件推送，或退回固定间隔轮询
+                remaining_time = deadline - time.monotonic()
+                if remaining_time <= 5:
+                    self.logger.warning(f"剩余时间不足 ({remaining_time:.1f}s)，停止搜索")
+                    break
+
+                if supports_idle:
+                    self.logger.info(
+                        f"进入IDLE等待新邮件... (剩余时间: {remaining_time:.1f}s)")
+                    if self._idle_wait(mail, remaining_time - 2):
+                        self.logger.info("📨 收到新邮件通知，立即重新搜索")
+                        # 新邮件到达，旧的搜索结果缓存立即作废
+                        self._search_cache.pop(search_time, None)
+                elif search_attempt < max_attempts:
                     wait_time = min(5, remaining_time - 2)  # 动态调整等待时间，但不超过5秒
                     self.logger.info(
                         f"本次搜索未找到验证码邮件，{wait_time:.1f}秒后重试... (剩余时间: {remaining_time:.1f}s)")
                     time.sleep(wait_time)
-                elif search_attempt >= max_attempts:
-                    self.logger.warning(f"已达到最大搜索次数限制 ({max_attempts} 次)")
-                    break
                 else:
-                    self.logger.warning(f"剩余时间不足 ({remaining_time:.1f}s)，停止搜索")
+                    self.logger.warning(f"已达到最大搜索次数限制 ({max_attempts} 次)")
                     break
 
-            mail.close()
-            mail.logout()
+            # 连接保留给下次调用复用，不logout
 
             # 提供详细的失败信息
-            total_time = time.time() - start_time
+            total_time = time.monotonic() - start_time
             self.logger.error(f"❌ 搜索失败总结:")
             self.logger.error(f"   • 总搜索时间: {total_time:.1f}s / {timeout}s")
             self.logger.error(f"   • 搜索尝试次数: {search_attempt}/{max_attempts}")
@@ -288,6 +476,8 @@ class GmailClient:
 
         except Exception as e:
             self.logger.error(f"IMAP连接失败: {e}")
+            # 出错的连接状态不可信，丢弃并在下次调用时重建
+            self.close()
 
             # 提供更详细的错误诊断
             error_msg = str(e)
@@ -313,6 +503,146 @@ class GmailClient:
 
             return None
 
+    # 单次搜索最多取回的候选邮件数
+    _MAX_CANDIDATES = 10
+
+    # 同一日期范围的搜索结果在此秒数内直接复用
+    _SEARCH_CACHE_TTL = 10.0
+
+    def _uid_search(self, mail, criteria):
+        """执行一次UID SEARCH，返回按UID从新到旧排序的候选列表
+
+        宽泛的兜底条件（如纯SINCE）可能命中成千上万个UID，
+        nlargest只挑最新的几个，不用对整个列表做全排序。
+        """
+        status, messages = mail.uid('SEARCH', None, criteria)
+        if status == 'OK' and messages[0]:
+            return heapq.nlargest(
+                self._MAX_CANDIDATES, messages[0].split(), key=int)
+        return []
+
+    def _search_candidates(self, mail, search_time):
+        """搜索候选验证码邮件
+
+        先用合并的OR表达式一次RTT拿到结果；为空时才退回
+        逐条的宽泛兜底条件。返回UID列表（bytes，从新到旧）。
+
+        已见过的UID通过水位线在服务器端排除（UID SEARCH是
+        区间求交，"UID n:*"始终包含邮箱里最后一封，所以本地
+        还要再按水位线过滤一次）。同一日期范围在TTL内的重复
+        搜索直接吃缓存；收到IDLE新邮件通知时缓存会被失效。
+        """
+        watermark = self._last_seen_uid
+        uid_clause = f'UID {watermark + 1}:* ' if watermark else ''
+
+        cached = self._search_cache.get(search_time)
+        if cached is not None and time.monotonic() - cached[0] < self._SEARCH_CACHE_TTL:
+            uids = [u for u in cached[1] if int(u) > watermark]
+            self.logger.debug(
+                f"复用 {time.monotonic() - cached[0]:.1f}s 前的搜索结果 "
+                f"({len(uids)} 封未处理)")
+            return uids
+
+        def _fresh(uids):
+            if watermark:
+                uids = [u for u in uids if int(u) > watermark]
+            if uids:
+                self._last_seen_uid = max(watermark, int(uids[0]))
+            return uids
+
+        def _remember(uids):
+            self._search_cache[search_time] = (time.monotonic(), uids)
+            return uids
+
+        merged = (f'{uid_clause}(SINCE "{search_time}") '
+                  f'{_SEARCH_OR_EXPR}')
+        try:
+            uids = _fresh(self._uid_search(mail, merged))
+            if uids:
+                self.logger.info(f"合并搜索找到 {len(uids)} 封候选邮件")
+                return _remember(uids)
+        except Exception as e:
+            self.logger.debug(f"合并搜索执行失败: {e}")
+
+        # 兜底：从宽泛到最宽泛逐条尝试。
+        # 注意IMAP BODY是字面量子串搜索不支持正则，"任意含6位数字的
+        # 邮件"无法在服务器端表达，靠客户端正则在提取阶段过滤
+        fallback_criteria = [
+            f'{uid_clause}(SINCE "{search_time}") (FROM "@m-team.cc")',
+            f'{uid_clause}(SINCE "{search_time}")',
+            f'{uid_clause}UNSEEN',
+        ]
+        for i, criteria in enumerate(fallback_criteria):
+            try:
+                self.logger.debug(
+                    f"兜底搜索条件 {i+1}/{len(fallback_criteria)}: {criteria}")
+                uids = _fresh(self._uid_search(mail, criteria))
+                if uids:
+                    self.logger.info(f"兜底搜索条件 {i+1} 找到 {len(uids)} 封邮件")
+                    return _remember(uids)
+            except Exception as e:
+                self.logger.debug(f"兜底搜索条件 {i+1} 执行失败: {e}")
+
+        return _remember([])
+
+    # 单次IDLE最长挂起时间：Gmail约29分钟断开空闲连接，提前重新武装
+    _IDLE_MAX_SECONDS = 25 * 60
+
+    def _idle_wait(self, mail, wait_seconds: float) -> bool:
+        """进入IMAP IDLE等待服务器推送新邮件通知
+
+        imaplib没有IDLE接口，这里手动发送IDLE命令并逐行读响应：
+        收到"* N EXISTS"（新邮件到达）或超时后发送DONE退出。
+
+        Returns:
+            bool: 是否收到了新邮件通知
+        """
+        wait_seconds = min(wait_seconds, self._IDLE_MAX_SECONDS)
+        tag = mail._new_tag()
+        sock = mail.socket()
+        old_timeout = sock.gettimeout()
+        got_new_mail = False
+
+        try:
+            mail.send(tag + b' IDLE\r\n')
+            deadline = time.monotonic() + wait_seconds
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                sock.settimeout(remaining)
+                try:
+                    line = mail.readline()
+                except (OSError, ssl.SSLError):
+                    # 超时或连接被动断开，退出IDLE交给上层重试
+                    break
+                if not line:
+                    break
+                if line.startswith(b'+'):
+                    continue  # 服务器确认进入IDLE
+                # EXISTS是新邮件到达的标准通知；部分服务器只推RECENT。
+                # EXPUNGE（别的客户端删信）等其他事件继续挂起等待
+                if b'EXISTS' in line or b'RECENT' in line:
+                    got_new_mail = True
+                    break
+        except Exception as idle_error:
+            self.logger.debug(f"IDLE等待异常: {idle_error}")
+        finally:
+            # 无论如何都要发DONE收尾，并吃掉对应的tagged响应
+            try:
+                sock.settimeout(10)
+                mail.send(b'DONE\r\n')
+                while True:
+                    line = mail.readline()
+                    if not line or line.startswith(tag):
+                        break
+            except Exception:
+                pass
+            sock.settimeout(old_timeout)
+
+        return got_new_mail
+
     def _delete_email_safely(self, mail, message_id: bytes) -> bool:
         """
         安全地删除指定的邮件
@@ -325,8 +655,8 @@ class GmailClient:
             bool: 删除是否成功
         """
         try:
-            # 标记邮件为已删除
-            mail.store(message_id, '+FLAGS', '\\Deleted')
+            # 标记邮件为已删除（按UID操作，不受序号变化影响）
+            mail.uid('STORE', message_id, '+FLAGS', '\\Deleted')
 
             # 执行删除操作
             result = mail.expunge()
@@ -342,56 +672,212 @@ class GmailClient:
             self.logger.error(f"删除邮件时发生错误: {e}")
             return False
 
-    def _extract_code_from_email(self, mail, message_id: bytes, sent_after_time: float = None) -> Optional[str]:
+    # 单次批量FETCH最多拉取的邮件数，限制单轮带宽
+    _MAX_BATCH_FETCH = 20
+
+    # 头部打分后真正抓取正文的邮件数上限
+    _MAX_BODY_FETCH = 3
+
+    # 单封邮件正文解码的字符数上限（验证码邮件远小于此）
+    _MAX_BODY_CHARS = 256_000
+
+    @staticmethod
+    def _split_fetch_response(msg_data):
+        """把多邮件FETCH响应按邮件分段
+
+        响应里每封邮件是若干(元信息, 字节串)元组，以裸的b')'收尾；
+        元信息行带UID和段名，按段名归类头部/正文。
+
+        Returns:
+            [(uid_bytes, header_bytes, text_bytes), ...]
         """
-        从邮件中提取验证码
+        messages = []
+        uid, header_bytes, text_bytes = None, b'', None
+        for part in msg_data:
+            if (isinstance(part, tuple) and len(part) > 1
+                    and isinstance(part[1], (bytes, bytearray))):
+                meta = part[0]
+                uid_match = _UID_RE.search(meta)
+                if uid_match:
+                    uid = uid_match.group(1)
+                if b'HEADER.FIELDS' in meta:
+                    header_bytes = part[1]
+                else:
+                    text_bytes = part[1]
+            elif (isinstance(part, (bytes, bytearray))
+                  and part.strip().endswith(b')')):
+                if uid is not None:
+                    messages.append((uid, header_bytes, text_bytes))
+                uid, header_bytes, text_bytes = None, b'', None
+        return messages
+
+    def _rank_candidates(self, mail, message_ids):
+        """只抓头部给候选邮件打分，挑出最像验证码邮件的前几封
+
+        一次批量FETCH拉回所有候选的FROM/SUBJECT/DATE头部，
+        按发送方和主题关键词打分排序；正文只对得分最高的
+        前_MAX_BODY_FETCH封抓取，收件箱繁忙时不用白拉一堆
+        推广邮件的HTML正文。
+
+        Returns:
+            [(uid_bytes, header_bytes), ...] 按得分从高到低
+        """
+        batch = message_ids[:self._MAX_BATCH_FETCH]
+        if not batch:
+            return []
+
+        try:
+            # PEEK不置位\\Seen标志，头部字段只有几百字节。
+            # CONTENT-TYPE/CONTENT-TRANSFER-ENCODING给正文阶段用：
+            # 判断TEXT段原始字节能否直接扫描，还是得整封抓取解码
+            status, msg_data = mail.uid(
+                'FETCH', b','.join(batch),
+                '(BODY.PEEK[HEADER.FIELDS (FROM SUBJECT DATE'
+                ' CONTENT-TYPE CONTENT-TRANSFER-ENCODING)])')
+        except Exception as e:
+            self.logger.error(f"批量抓取邮件头部失败: {e}")
+            return []
+
+        if status != 'OK' or not msg_data:
+            return []
+
+        scored = []
+        for uid, header_bytes, _ in self._split_fetch_response(msg_data):
+            try:
+                message = _HEADER_PARSER.parsebytes(header_bytes)
+                sender = str(message.get('From') or '').lower()
+                subject = str(message.get('Subject') or '')
+            except Exception as parse_error:
+                self.logger.debug(f"解析邮件头部失败: {parse_error}")
+                continue
+
+            score = 0
+            if 'm-team' in sender or 'mteam' in sender:
+                score += 10
+            subject_lower = subject.lower()
+            if ('验证' in subject or 'code' in subject_lower
+                    or 'verification' in subject_lower):
+                score += 5
+            # 得分相同的按UID取较新的
+            scored.append((score, int(uid), uid, header_bytes))
+
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [(uid, header_bytes)
+                for _, _, uid, header_bytes in scored[:self._MAX_BODY_FETCH]]
+
+    def _extract_codes_from_messages(self, mail, message_ids) -> Optional[tuple]:
+        """批量抓取候选邮件并提取验证码
+
+        两阶段抓取：先用一次批量FETCH拉回全部候选的头部打分，
+        再用第二次批量FETCH只拉得分最高几封的正文，
+        替代逐封抓整个正文的N次往返。
 
         Args:
             mail: IMAP连接对象
-            message_id: 邮件ID
-            sent_after_time: 只处理在此时间戳之后收到的邮件（Unix时间戳）
+            message_ids: 候选邮件UID列表（bytes，从新到旧）
 
         Returns:
-            验证码字符串
+            (邮件UID, 验证码)元组，全部未命中时返回None
         """
+        ranked = self._rank_candidates(mail, message_ids)
+        if not ranked:
+            return None
+
         try:
-            # 获取邮件内容
-            status, msg_data = mail.fetch(message_id, '(RFC822)')
+            # 只取正文前16KB：验证码一定在第一屏，带附件的营销邮件
+            # 可能有数MB的TEXT段，partial fetch直接在服务器端截断
+            status, msg_data = mail.uid(
+                'FETCH', b','.join(uid for uid, _ in ranked),
+                '(BODY.PEEK[TEXT]<0.16384>)')
+        except Exception as e:
+            self.logger.error(f"批量抓取邮件正文失败: {e}")
+            return None
 
-            if status != 'OK':
-                return None
+        texts = {}
+        if status == 'OK' and msg_data:
+            for uid, _, text_bytes in self._split_fetch_response(msg_data):
+                texts[uid] = text_bytes
 
-            # 解析邮件
-            email_body = msg_data[0][1]
-            message = email.message_from_bytes(email_body)
+        for msg_id, header_bytes in ranked:
+            try:
+                code = self._extract_code_from_parts(
+                    mail, msg_id, header_bytes, texts.get(msg_id))
+                if code:
+                    return msg_id, code
+            except Exception as e:
+                self.logger.error(f"解析邮件时发生错误: {e}")
+
+        return None
+
+    def _extract_code_from_parts(self, mail, message_id: bytes,
+                                 header_bytes: bytes,
+                                 text_bytes: Optional[bytes]) -> Optional[str]:
+        """
+        从已抓取的头部字段和正文文本中提取验证码
 
-            # 记录邮件发送方和主题，方便调试
-            sender = message.get('From', '未知发送方')
-            subject = message.get('Subject', '无主题')
+        Args:
+            mail: IMAP连接对象（multipart邮件兜底整封抓取时使用）
+            message_id: 邮件UID
+            header_bytes: HEADER.FIELDS响应的头部字节
+            text_bytes: BODY[TEXT]响应的正文字节，可能为None
 
-            # 检查邮件时间是否符合要求
-            if sent_after_time:
-                date_header = message.get('Date')
-                if date_header:
-                    try:
-                        from email.utils import parsedate_to_datetime
-                        email_time = parsedate_to_datetime(date_header)
-                        email_timestamp = email_time.timestamp()
+        Returns:
+            验证码字符串
+        """
+        try:
+            message = _HEADER_PARSER.parsebytes(header_bytes)
 
-                        if email_timestamp < sent_after_time:
-                            self.logger.info(
-                                f"跳过旧邮件 - 发送方: {sender}, 时间: {email_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                            return None
-                        else:
-                            self.logger.info(
-                                f"处理新邮件 - 发送方: {sender}, 时间: {email_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                    except Exception as time_error:
-                        self.logger.warning(f"解析邮件时间失败，继续处理: {time_error}")
+            # 记录邮件发送方和主题，方便调试。
+            # 时效性由UID水位线在搜索阶段保证（UID大于水位线即为新邮件），
+            # 这里不再逐封解析Date头做客户端过滤
+            sender = message.get('From', '未知发送方')
+            subject = message.get('Subject', '无主题')
 
             self.logger.info(f"正在处理邮件 - 发送方: {sender}, 主题: {subject}")
 
-            # 获取邮件正文
-            body = self._get_email_body(message)
+            # TEXT段原始字节只有在非multipart、且传输编码不改变字节
+            # 面貌（7bit/8bit/quoted-printable）时才能直接使用；
+            # base64正文（中文邮件常见）按UTF-8解出来是乱码，
+            # 必须退回整封抓取走完整的MIME解码
+            cte = str(message.get('Content-Transfer-Encoding')
+                      or '').strip().lower()
+            simple_text = (
+                text_bytes is not None
+                and message.get_content_maintype() != 'multipart'
+                and cte in ('', '7bit', '8bit', 'quoted-printable'))
+            if simple_text and cte == 'quoted-printable':
+                # =XX转义和软换行会打断数字串，先解码成原始字节
+                text_bytes = quopri.decodestring(text_bytes)
+
+            # 纯文本正文先在原始字节上做廉价的6位数字预扫，
+            # 命中就不需要解码整段正文。只有恰好一个不同的6位串时
+            # 才短路返回：正文同时出现年份/订单号/跟踪ID等多个6位串时，
+            # 交给下面的提示词邻近扫描裁决，避免选中第一个无关数字。
+            # HTML正文标签属性里数字多，不走预扫，剥标签后再匹配
+            if simple_text and b'</' not in text_bytes:
+                sixes = {m.group(1)
+                         for m in _SIX_DIGITS_BYTES_RE.finditer(text_bytes)}
+                if len(sixes) == 1:
+                    code = sixes.pop().decode('ascii')
+                    self.logger.info(f"从邮件中提取到6位数字验证码: {code}")
+                    return code
+
+            # 简单文本邮件的TEXT部分可以直接解码；
+            # multipart/base64原文才退回整封抓取走完整解析
+            if simple_text:
+                body = text_bytes.decode('utf-8', errors='ignore')
+                # 单part的HTML邮件也会走这条快路径，同样先剥掉标签
+                # 再交给正则，避免扫描标签属性里的数字
+                if '</' in body:
+                    body = _html_to_text(body)
+            else:
+                status, msg_data = mail.uid(
+                    'FETCH', message_id, '(BODY.PEEK[])')
+                if status != 'OK' or not msg_data or msg_data[0] is None:
+                    return None
+                full_message = email.message_from_bytes(
+                    msg_data[0][1], policy=policy.default)
+                body = self._get_email_body(full_message)
 
             if not body:
                 return None
@@ -399,33 +885,50 @@ class GmailClient:
             # 记录邮件内容以便调试（截取前200字符）
             self.logger.debug(f"邮件正文预览: {body[:200]}...")
 
-            # 优化的验证码匹配模式（优先匹配数字验证码）
-            patterns = [
-                r'(\d{6})',  # 6位纯数字验证码（M-Team最常用）
-                r'(\d{4,8})',  # 4-8位纯数字验证码
-                r'验证码[：:\s]*(\d{4,8})',  # 中文+数字
-                r'verification code[：:\s]*(\d{4,8})',  # 英文+数字
-                r'code[：:\s]*(\d{4,8})',  # code+数字
-                r'验证码[：:\s]*([A-Za-z0-9]{4,8})',  # 中文+字母数字
-                r'verification code[：:\s]*([A-Za-z0-9]{4,8})',  # 英文+字母数字
-                r'(?:^|\s)([A-Z0-9]{6})(?:\s|$)',  # 独立的6位大写字母数字组合
-            ]
-
-            for pattern in patterns:
-                matches = re.findall(
-                    pattern, body, re.IGNORECASE | re.MULTILINE)
-                for code in matches:
-                    code = code.strip()
-                    # 验证码长度和格式检查
-                    if len(code) >= 4 and not code.lower() in ['image', 'style', 'class', 'width', 'height', 'color']:
-                        # 进一步验证：如果是6位数字，优先返回
-                        if len(code) == 6 and code.isdigit():
-                            self.logger.info(f"从邮件中提取到6位数字验证码: {code}")
-                            return code
-                        # 其他格式的验证码
-                        elif len(code) >= 4:
-                            self.logger.info(f"从邮件中提取到验证码: {code}")
-                            return code
+            # 先收集提示词位置，再一趟扫描所有数字串；
+            # 两个有序位置序列用单调指针求邻近，整体线性
+            ctx_ends = [m.end() for m in _CTX_RE.finditer(body)]
+            ctx_idx = 0
+            best_ctx = None  # 提示词邻近但非6位的候选
+            first_six = None  # 无提示词的首个6位数字
+            first_any = None  # 无提示词的首个数字串
+
+            for m in _DIGITS_RE.finditer(body):
+                code = m.group()
+                start = m.start()
+                while (ctx_idx < len(ctx_ends)
+                       and ctx_ends[ctx_idx] < start - _CTX_WINDOW):
+                    ctx_idx += 1
+                near_ctx = (ctx_idx < len(ctx_ends)
+                            and ctx_ends[ctx_idx] <= start)
+
+                if near_ctx:
+                    if len(code) == 6:
+                        # 提示词邻近的6位数字：最高优先级，立即返回
+                        self.logger.info(f"从邮件中提取到6位数字验证码: {code}")
+                        return code
+                    if best_ctx is None:
+                        best_ctx = code
+                elif len(code) == 6:
+                    if first_six is None:
+                        first_six = code
+                elif first_any is None:
+                    first_any = code
+
+            # 提示词邻近的候选优先于孤立的6位数字：正文里无关的
+            # 6位串（订单号、年份、跟踪ID）出现得比想象中频繁
+            code = best_ctx or first_six or first_any
+            if code:
+                self.logger.info(f"从邮件中提取到验证码: {code}")
+                return code
+
+            # 纯字母数字验证码（无数字串可用时的兜底）
+            alnum = _ALNUM_CODE_RE.search(body)
+            if alnum:
+                code = alnum.group(1)
+                if code.lower() not in _FALSE_POSITIVE_CODES:
+                    self.logger.info(f"从邮件中提取到验证码: {code}")
+                    return code
 
             self.logger.warning("未能从邮件中提取验证码")
             return None
@@ -444,11 +947,18 @@ class GmailClient:
         Returns:
             邮件正文字符串
         """
-        body = ""
+        plain_parts = []
+        html_parts = []
+        total_chars = 0
 
         try:
             if message.is_multipart():
                 for part in message.walk():
+                    # 验证码邮件不会有这么大的正文；设上限防止
+                    # 超大邮件（恶意或误投）把内存和正则扫描拖垮
+                    if total_chars > self._MAX_BODY_CHARS:
+                        self.logger.debug("邮件正文超过大小上限，截断处理")
+                        break
                     content_type = part.get_content_type()
                     content_disposition = str(part.get("Content-Disposition"))
 
@@ -456,22 +966,41 @@ class GmailClient:
                     if "attachment" in content_disposition:
                         continue
 
-                    # 获取文本内容
+                    # 纯文本和HTML分开收集，append+join避免O(n²)的字符串拼接。
+                    # multipart/alternative里HTML只是plain的重复版本且大得多，
+                    # 已经拿到纯文本时连解码都省掉
+                    if content_type == "text/html" and plain_parts:
+                        continue
                     if content_type == "text/plain" or content_type == "text/html":
                         charset = part.get_content_charset() or 'utf-8'
                         part_body = part.get_payload(decode=True)
                         if part_body:
-                            body += part_body.decode(charset, errors='ignore')
+                            decoded = part_body.decode(charset, errors='ignore')
+                            total_chars += len(decoded)
+                            if content_type == "text/plain":
+                                plain_parts.append(decoded)
+                            else:
+                                html_parts.append(decoded)
             else:
                 charset = message.get_content_charset() or 'utf-8'
-                body = message.get_payload(decode=True)
-                if body:
-                    body = body.decode(charset, errors='ignore')
+                payload = message.get_payload(decode=True)
+                if payload:
+                    decoded = payload.decode(charset, errors='ignore')
+                    if message.get_content_type() == "text/html":
+                        html_parts.append(decoded)
+                    else:
+                        plain_parts.append(decoded)
 
         except Exception as e:
             self.logger.error(f"解析邮件正文时发生错误: {e}")
 
-        return body
+        # 优先用纯文本部分；只有HTML时先剥掉标签再交给正则，
+        # 正文体积通常缩小5-10倍，也避免匹配到标签属性里的数字
+        if plain_parts:
+            return ''.join(plain_parts)
+        if html_parts:
+            return _html_to_text(''.join(html_parts))
+        return ""
 
     def get_verification_code(self, timeout: int = 300, sent_after_time: float = None) -> Optional[str]:
         """
@@ -486,7 +1015,25 @@ class GmailClient:
         """
         self.logger.info("开始使用 IMAP 方法获取验证码...")
         if sent_after_time:
-            import time
             self.logger.info(
                 f"只查找在 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sent_after_time))} 之后收到的邮件")
         return self.get_verification_code_via_imap(timeout, sent_after_time)
+
+    async def get_verification_code_async(self, timeout: int = 300,
+                                          sent_after_time: float = None) -> Optional[str]:
+        """
+        获取验证码的异步入口
+
+        IMAP等待（IDLE挂起/轮询sleep）会阻塞调用线程；异步调用方
+        （如和浏览器操作并发的事件循环）用这个入口把整个流程挪到
+        工作线程执行，事件循环期间可以继续跑表单提交等其他任务。
+
+        Args:
+            timeout: 超时时间（秒）
+            sent_after_time: 只查找在此时间戳之后收到的邮件（Unix时间戳）
+
+        Returns:
+            验证码字符串，如果未找到则返回None
+        """
+        return await asyncio.to_thread(
+            self.get_verification_code, timeout, sent_after_time)
@@ -4,6 +4,7 @@
 M-Team 自动登录和邮箱验证码获取脚本
 """
 
+import functools
 import time
 import re
 import json
@@ -18,6 +19,7 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.remote.remote_connection import RemoteConnection
 import requests
 from gmail_client import GmailClient
 import os
@@ -41,6 +43,82 @@ logging.basicConfig(
 )
 
 
+@functools.lru_cache(maxsize=4)
+def _load_config_cached(config_file: str, mtime_ns: int) -> Dict[str, Any]:
+    """解析配置文件，按(路径, mtime)缓存
+
+    mtime_ns参与缓存键：文件被修改后缓存自动失效，
+    重复实例化MTeamLogin时则直接复用上次的解析结果。
+    """
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_path_cached(relpath: str, base_dir: str) -> str:
+    """把相对于脚本上级目录的路径解析为normpath后的绝对路径（带缓存）"""
+    return os.path.normpath(os.path.join(base_dir, '..', relpath))
+
+
+# 反检测脚本：合并为一段JS，通过CDP在每次新文档创建前注入。
+# 相比逐条execute_script，只有一次driver往返，且在页面自身脚本
+# 执行之前就已生效，不会出现navigator.webdriver短暂为true的窗口
+_STEALTH_JS = """
+Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+Object.defineProperty(navigator, 'userAgent', {
+    get: () => 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.7258.67 Safari/537.36'
+});
+Object.defineProperty(navigator, 'plugins', {
+    get: () => [1, 2, 3, 4, 5]
+});
+Object.defineProperty(navigator, 'languages', {
+    get: () => ['en-US', 'en', 'zh-CN', 'zh']
+});
+Object.defineProperty(screen, 'width', {get: () => 1920});
+Object.defineProperty(screen, 'height', {get: () => 1080});
+"""
+
+# 选择器和关键词常量：提升到模块级，轮询循环反复调用检测方法时
+# 复用同一批对象，不再每次调用都重建列表
+_HOMEPAGE_KEYWORDS = ('index', 'home', 'main', 'dashboard')
+
+_ERROR_XPATHS = (
+    "//div[contains(@class, 'error') or contains(@class, 'alert') or contains(@class, 'danger')]",
+    "//div[contains(text(), '错误') or contains(text(), '失败') or contains(text(), 'error') or contains(text(), 'failed')]",
+)
+
+# 两条错误XPath用|合并成一次联合查询，探测只需一次driver往返
+_ERROR_XPATH_UNION = " | ".join(_ERROR_XPATHS)
+
+_VERIFY_URL_KEYWORDS = ('verify', '2fa', 'verification', 'email')
+_VERIFY_TITLE_KEYWORDS = ('验证', 'verification', '2fa', 'email')
+
+_EMAIL_VERIFY_XPATHS = (
+    "//input[contains(@placeholder, '验证码') or contains(@placeholder, 'verification') or contains(@placeholder, 'code') or contains(@placeholder, '輸入')]",
+    "//button[contains(text(), '获取验证码') or contains(text(), '獲取驗證碼') or contains(text(), '验证') or contains(text(), '驗證')]",
+    "//div[contains(@class, 'verification') or contains(@class, 'email-verify')]",
+)
+
+_SEND_CODE_SELECTORS = (
+    (By.XPATH,
+     "//button[contains(@class, 'ant-btn-default') and contains(., '獲取驗證碼')]"),
+    (By.XPATH,
+     "//button[contains(text(), '獲取驗證碼') or contains(text(), '获取验证码')]"),
+    (By.CSS_SELECTOR, "button.ant-btn-default"),
+)
+
+_CODE_INPUT_XPATHS = ("//input[@placeholder='輸入6位數字驗證碼']",)
+
+_SUCCESS_URLS = frozenset({'index', 'home', 'main', 'dashboard',
+                           'user', 'member', 'browse', 'torrents'})
+
+_SUCCESS_ELEMENT_XPATHS = (
+    "//a[contains(@href, 'logout') or contains(text(), '退出') or contains(text(), '登出')]",
+    "//div[contains(@class, 'user') and not(contains(@class, 'login'))]",
+    "//a[contains(@href, 'user') or contains(@href, 'profile')]",
+)
+
+
 class MTeamLogin:
     def __init__(self, config_file: str = None):
         """
@@ -95,9 +173,11 @@ class MTeamLogin:
                     # 如果所有路径都不存在，使用原始路径并让它抛出FileNotFoundError
                     pass
 
-            with open(config_file, 'r', encoding='utf-8') as f:
-                self.logger.info(f"成功加载配置文件: {config_file}")
-                return json.load(f)
+            # 解析结果按mtime缓存：同一配置文件未改动时跳过读取和JSON解析
+            mtime_ns = os.stat(config_file).st_mtime_ns
+            config = _load_config_cached(config_file, mtime_ns)
+            self.logger.info(f"成功加载配置文件: {config_file}")
+            return config
         except FileNotFoundError:
             self.logger.error(f"配置文件 {config_file} 不存在")
             raise
@@ -106,38 +186,15 @@ class MTeamLogin:
             raise
 
     def _setup_stealth_mode(self, driver):
-        """设置隐身模式，避免被检测为自动化"""
-        try:
-            # 隐藏webdriver特征
-            driver.execute_script(
-                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-
-            # 修改user-agent中的HeadlessChrome标识
-            driver.execute_script("""
-                Object.defineProperty(navigator, 'userAgent', {
-                    get: () => 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.7258.67 Safari/537.36'
-                });
-            """)
-
-            # 隐藏自动化相关属性
-            driver.execute_script("""
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => [1, 2, 3, 4, 5]
-                });
-            """)
-
-            driver.execute_script("""
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['en-US', 'en', 'zh-CN', 'zh']
-                });
-            """)
-
-            # 模拟真实的屏幕参数
-            driver.execute_script("""
-                Object.defineProperty(screen, 'width', {get: () => 1920});
-                Object.defineProperty(screen, 'height', {get: () => 1080});
-            """)
+        """设置隐身模式，避免被检测为自动化
 
+        用一次CDP调用注入全部反检测脚本，代替原先逐条execute_script
+        的5次HTTP往返；注入发生在导航之前，对后续每个新页面都生效。
+        """
+        try:
+            driver.execute_cdp_cmd(
+                "Page.addScriptToEvaluateOnNewDocument",
+                {"source": _STEALTH_JS})
             self.logger.info("已设置反检测模式")
 
         except Exception as e:
@@ -187,21 +244,21 @@ class MTeamLogin:
         chrome_binary_path = self.config.get('chrome_binary_path')
         chromedriver_path = self.config.get('chromedriver_path')
 
-        # 处理相对路径，确保正确解析
+        # 处理相对路径，确保正确解析（解析结果带缓存，重复启动时不再重复拼接）
         if chrome_binary_path:
             if not os.path.isabs(chrome_binary_path):
                 # 相对路径：基于脚本所在目录的上级目录
-                script_dir = os.path.dirname(os.path.abspath(__file__))
-                chrome_binary_path = os.path.join(
-                    script_dir, '..', chrome_binary_path)
-            chrome_binary_path = os.path.normpath(chrome_binary_path)
+                chrome_binary_path = _resolve_path_cached(
+                    chrome_binary_path, script_dir)
+            else:
+                chrome_binary_path = os.path.normpath(chrome_binary_path)
 
         if chromedriver_path:
             if not os.path.isabs(chromedriver_path):
-                script_dir = os.path.dirname(os.path.abspath(__file__))
-                chromedriver_path = os.path.join(
-                    script_dir, '..', chromedriver_path)
-            chromedriver_path = os.path.normpath(chromedriver_path)
+                chromedriver_path = _resolve_path_cached(
+                    chromedriver_path, script_dir)
+            else:
+                chromedriver_path = os.path.normpath(chromedriver_path)
 
         # 检查Chrome浏览器路径
         if not chrome_binary_path or not os.path.exists(chrome_binary_path):
@@ -226,6 +283,9 @@ class MTeamLogin:
         # 使用项目内ChromeDriver
         try:
             self.logger.info(f"使用项目内ChromeDriver: {chromedriver_path}")
+            # 把与ChromeDriver通信的HTTP超时从urllib3默认的120秒降到30秒：
+            # 浏览器卡死时find_element等调用秒级报错，不再挂住两分钟
+            RemoteConnection.set_timeout(30)
             service = Service(chromedriver_path)
             driver = webdriver.Chrome(service=service, options=chrome_options)
 
@@ -233,7 +293,9 @@ class MTeamLogin:
             self._setup_stealth_mode(driver)
 
             # 设置各种超时时间（优化等待时间）
-            driver.implicitly_wait(3)  # 减少到3秒，提高响应速度
+            # 关闭隐式等待：否则每次find_element找不到元素都会白等3秒，
+            # 需要等待的地方一律用显式WebDriverWait（0.1秒轮询）
+            driver.implicitly_wait(0)
             driver.set_page_load_timeout(20)  # 减少页面加载超时
             driver.set_script_timeout(15)     # 减少脚本执行超时
 
@@ -278,21 +340,22 @@ class MTeamLogin:
             else:
                 self.logger.info("跳过人类行为模拟延迟")
 
-            # 访问登录页面，增加重试机制
+            # 访问登录页面，增加重试机制（指数退避+抖动，受总截止时间约束）
             max_retries = 3
+            deadline = time.monotonic() + self.config.get('login_deadline', 60)
             for attempt in range(max_retries):
                 try:
                     self.logger.info(f"尝试访问登录页面 (第{attempt + 1}次)...")
                     self.driver.get(self.login_url)
 
-                    # 根据配置决定是否使用随机延迟
+                    # 条件轮询等待页面就绪，取代原先固定的4-8秒sleep：
+                    # 页面加载完成即继续，慢网络下最多等到超时
+                    self.logger.info("等待页面加载完成...")
+                    self._wait_ready()
+
+                    # 根据配置保留少量随机延迟，模拟人类反应时间
                     if anti_detection.get('random_delays', True):
-                        load_delay = random.uniform(4, 8)
-                        self.logger.info(f"等待页面加载完成 ({load_delay:.1f}秒)...")
-                        time.sleep(load_delay)
-                    else:
-                        self.logger.info("等待页面加载完成...")
-                        time.sleep(3)  # 固定延迟
+                        time.sleep(random.uniform(0.3, 1.0))
 
                     # 检查页面是否正常加载
                     current_url = self.driver.current_url
@@ -304,12 +367,13 @@ class MTeamLogin:
 
                 except Exception as e:
                     self.logger.warning(f"第{attempt + 1}次访问失败: {e}")
-                    if attempt == max_retries - 1:
+                    if attempt == max_retries - 1 or time.monotonic() >= deadline:
                         # 最后一次重试失败，尝试重新创建driver
                         self.logger.error("所有访问尝试失败，可能需要重新启动浏览器")
                         raise
 
-                    # 如果是连接丢失错误，尝试重新创建driver
+                    # 如果是连接丢失错误，尝试重新创建driver；
+                    # 重建本身已经够重，不再额外退避
                     if "session deleted" in str(e) or "disconnected" in str(e):
                         self.logger.warning("检测到浏览器连接丢失，重新启动浏览器...")
                         try:
@@ -317,8 +381,15 @@ class MTeamLogin:
                         except:
                             pass
                         self.driver = self.init_driver()
+                        continue
 
-                    time.sleep(3)  # 等待3秒后重试
+                    # 指数退避: 0.5/1/2秒加随机抖动，瞬时故障第一次重试
+                    # 几乎立即进行；退避时间不会睡过总截止时间
+                    backoff = min(
+                        0.5 * (2 ** attempt) + random.uniform(0, 0.25),
+                        deadline - time.monotonic())
+                    if backoff > 0:
+                        time.sleep(backoff)
 
             # 检查页面标题和URL
             self.logger.info(f"页面标题: {self.driver.title}")
@@ -326,9 +397,8 @@ class MTeamLogin:
 
             # 检查是否已经跳转到首页（说明已经登录）
             current_url = self.driver.current_url.lower()
-            homepage_keywords = ['index', 'home', 'main', 'dashboard']
             found_keyword = next(
-                (kw for kw in homepage_keywords if kw in current_url), None)
+                (kw for kw in _HOMEPAGE_KEYWORDS if kw in current_url), None)
 
             if found_keyword:
                 self.logger.info(
@@ -356,7 +426,9 @@ class MTeamLogin:
             for by, selector in selectors:
                 try:
                     self.logger.info(f"尝试查找元素: {by} = {selector}")
-                    username_input = WebDriverWait(self.driver, 5).until(
+                    username_input = WebDriverWait(
+                        self.driver, 5, poll_frequency=0.1
+                    ).until(
                         EC.presence_of_element_located((by, selector))
                     )
                     self.logger.info(f"成功找到用户名输入框: {by} = {selector}")
@@ -525,32 +597,41 @@ class MTeamLogin:
             self.logger.error(f"登录过程中发生错误: {e}")
             return False
 
+    def _wait_ready(self, timeout: int = 15, poll: float = 0.1):
+        """等待页面DOM就绪
+
+        先轮询document.readyState到complete，再确认用户名输入框出现。
+        poll取0.1秒（Selenium默认0.5秒），页面就绪后最快0.1秒内返回。
+        """
+        wait = WebDriverWait(self.driver, timeout, poll_frequency=poll)
+        wait.until(lambda d: d.execute_script(
+            "return document.readyState") == "complete")
+        try:
+            wait.until(EC.presence_of_element_located((By.ID, "username")))
+        except TimeoutException:
+            # 已通过Cookie登录时页面没有登录表单，readyState就绪即可继续
+            pass
+
     def _check_page_errors(self) -> list:
-        """检查页面错误信息"""
+        """检查页面错误信息（一次XPath联合查询代替逐条探测）"""
         error_messages = []
-        error_selectors = [
-            "//div[contains(@class, 'error') or contains(@class, 'alert') or contains(@class, 'danger')]",
-            "//div[contains(text(), '错误') or contains(text(), '失败') or contains(text(), 'error') or contains(text(), 'failed')]"
-        ]
-
-        for selector in error_selectors:
-            try:
-                elements = self.driver.find_elements(By.XPATH, selector)
-                for element in elements:
-                    text = element.text.strip()
-                    if text:
-                        error_messages.append(text)
-            except:
-                continue
+        try:
+            elements = self.driver.find_elements(By.XPATH, _ERROR_XPATH_UNION)
+            for element in elements:
+                text = element.text.strip()
+                if text:
+                    error_messages.append(text)
+        except:
+            pass
         return error_messages
 
     def _has_login_form(self) -> bool:
-        """检查是否存在登录表单"""
+        """检查是否存在登录表单（隐式等待已关闭，元素缺失立即返回）"""
         try:
             self.driver.find_element(By.ID, "username")
             self.driver.find_element(By.ID, "password")
             return True
-        except:
+        except NoSuchElementException:
             return False
 
     def _is_email_verification_page(self) -> bool:
@@ -560,21 +641,12 @@ class MTeamLogin:
             current_url = self.driver.current_url.lower()
             page_title = self.driver.title.lower()
 
-            url_keywords = ["verify", "2fa", "verification", "email"]
-            title_keywords = ["验证", "verification", "2fa", "email"]
-
-            if any(k in current_url for k in url_keywords) or any(k in page_title for k in title_keywords):
+            if any(k in current_url for k in _VERIFY_URL_KEYWORDS) or any(k in page_title for k in _VERIFY_TITLE_KEYWORDS):
                 return True
 
             # 检查邮箱验证元素
-            wait = WebDriverWait(self.driver, 2)
-            verification_selectors = [
-                "//input[contains(@placeholder, '验证码') or contains(@placeholder, 'verification') or contains(@placeholder, 'code') or contains(@placeholder, '輸入')]",
-                "//button[contains(text(), '获取验证码') or contains(text(), '獲取驗證碼') or contains(text(), '验证') or contains(text(), '驗證')]",
-                "//div[contains(@class, 'verification') or contains(@class, 'email-verify')]"
-            ]
-
-            for selector in verification_selectors:
+            wait = WebDriverWait(self.driver, 2, poll_frequency=0.1)
+            for selector in _EMAIL_VERIFY_XPATHS:
                 try:
                     element = wait.until(
                         EC.presence_of_element_located((By.XPATH, selector)))
@@ -591,7 +663,30 @@ class MTeamLogin:
             return False
 
     def _find_element_by_selectors(self, selectors, description="元素"):
-        """通过多个选择器查找元素"""
+        """通过多个选择器查找元素
+
+        选择器全部是XPath时用|合并成一条联合查询，N次driver往返
+        变为1次；混合By类型（如CSS）时退回逐个尝试。
+        """
+        xpaths = []
+        for selector_info in selectors:
+            if isinstance(selector_info, tuple):
+                by, selector = selector_info
+                if by != By.XPATH:
+                    xpaths = None
+                    break
+                xpaths.append(selector)
+            else:
+                xpaths.append(selector_info)
+
+        if xpaths:
+            try:
+                elements = self.driver.find_elements(
+                    By.XPATH, " | ".join(xpaths))
+                return elements[0] if elements else None
+            except:
+                return None
+
         for selector_info in selectors:
             try:
                 if isinstance(selector_info, tuple):
@@ -633,15 +728,8 @@ class MTeamLogin:
                 self.logger.warning("未找到邮箱输入框，可能已预填充")
 
             # 查找并点击发送验证码按钮
-            send_button_selectors = [
-                (By.XPATH,
-                 "//button[contains(@class, 'ant-btn-default') and contains(., '獲取驗證碼')]"),
-                (By.XPATH,
-                 "//button[contains(text(), '獲取驗證碼') or contains(text(), '获取验证码')]"),
-                (By.CSS_SELECTOR, "button.ant-btn-default")
-            ]
             send_code_button = self._find_element_by_selectors(
-                send_button_selectors, "发送验证码按钮")
+                _SEND_CODE_SELECTORS, "发送验证码按钮")
 
             # 记录发送验证码的时间戳
             import time
@@ -654,14 +742,13 @@ class MTeamLogin:
                     send_time = time.time()  # 记录发送时间
                     self.logger.info(
                         f"成功点击发送验证码按钮，发送时间: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(send_time))}")
-                    time.sleep(5)  # 等待邮件发送
+                    # 不再固定等5秒，直接开始轮询IMAP——邮件往返本身就是天然的节奏
                 else:
                     self.logger.warning("点击发送验证码按钮失败")
 
             # 查找验证码输入框
-            code_selectors = ["//input[@placeholder='輸入6位數字驗證碼']"]
             code_input = self._find_element_by_selectors(
-                code_selectors, "验证码输入框")
+                _CODE_INPUT_XPATHS, "验证码输入框")
             if not code_input:
                 self.logger.error("未找到验证码输入框")
                 return False
@@ -670,17 +757,13 @@ class MTeamLogin:
             self.logger.info("正在从Gmail获取最新验证码...")
             self.gmail_client = GmailClient(self.config)
 
-            verification_code = None
-            for attempt in range(5):
-                self.logger.info(f"第{attempt+1}次尝试获取验证码...")
-                # 传递发送时间，确保获取新邮件
-                verification_code = self.gmail_client.get_verification_code(
-                    timeout=60, sent_after_time=send_time)
-                if verification_code:
-                    break
-                if attempt < 4:  # 不是最后一次尝试
-                    self.logger.info("等待5秒后重试...")
-                    time.sleep(5)
+            # 一次调用给足60秒预算：GmailClient内部用IMAP IDLE推送
+            # （不支持时退化为自适应轮询）自己分配这段时间，邮件一到
+            # 立即返回。外层再包一圈短超时轮询反而会让IDLE路径永远
+            # 走不到，还会反复命中搜索结果缓存里的空结果
+            # （传递发送时间，确保获取新邮件）
+            verification_code = self.gmail_client.get_verification_code(
+                timeout=60, sent_after_time=send_time)
 
             if not verification_code:
                 self.logger.error("未能获取到验证码")
@@ -725,9 +808,7 @@ class MTeamLogin:
             page_title = self.driver.title
 
             # 检查URL跳转（M-Team首页特征）
-            success_urls = ['index', 'home', 'main', 'dashboard',
-                            'user', 'member', 'browse', 'torrents']
-            if any(keyword in current_url for keyword in success_urls):
+            if any(keyword in current_url for keyword in _SUCCESS_URLS):
                 self.logger.info(f"URL跳转成功: {current_url}")
 
                 # 进一步验证：检查M-Team首页特有的标题特征
@@ -747,14 +828,8 @@ class MTeamLogin:
 
             # 检查登录成功元素（快速检查）
             try:
-                wait = WebDriverWait(self.driver, 2)
-                success_elements = [
-                    "//a[contains(@href, 'logout') or contains(text(), '退出') or contains(text(), '登出')]",
-                    "//div[contains(@class, 'user') and not(contains(@class, 'login'))]",
-                    "//a[contains(@href, 'user') or contains(@href, 'profile')]"
-                ]
-
-                for selector in success_elements:
+                wait = WebDriverWait(self.driver, 2, poll_frequency=0.1)
+                for selector in _SUCCESS_ELEMENT_XPATHS:
                     try:
                         element = wait.until(
                             EC.presence_of_element_located((By.XPATH, selector)))